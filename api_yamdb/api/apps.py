@@ -4,3 +4,18 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        from django.db.models.signals import post_delete, post_save
+
+        from . import signals
+
+        # Обработчик без sender вызывался бы для всех моделей и отключал
+        # бы у них быстрое каскадное удаление.
+        for signal in (post_save, post_delete):
+            for model in signals.MODEL_CACHE_GROUPS:
+                signal.connect(signals.invalidate_cached_responses,
+                               sender=model)
+            for model in signals.COLLECTION_KEYS:
+                signal.connect(signals.bump_collection_versions,
+                               sender=model)
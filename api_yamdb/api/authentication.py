@@ -0,0 +1,99 @@
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from users.models import User
+
+ROLE_CLAIM = 'role'
+SUPERUSER_CLAIM = 'is_superuser'
+USERNAME_CLAIM = 'username'
+
+
+class RoleRefreshToken(RefreshToken):
+    """Refresh-токен, содержащий роль пользователя и флаг суперпользователя."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token[ROLE_CLAIM] = user.role
+        token[SUPERUSER_CLAIM] = user.is_superuser
+        token[USERNAME_CLAIM] = user.username
+        return token
+
+
+class StatelessUser(TokenUser):
+    """
+    Пользователь, права которого определяются по claims токена.
+    Строка пользователя загружается из БД только при обращении
+    к instance или к полям модели, которых нет в токене.
+    """
+
+    @cached_property
+    def role(self):
+        return self.token[ROLE_CLAIM]
+
+    @property
+    def is_admin(self):
+        return self.role == User.ADMIN or self.is_super_user
+
+    @property
+    def is_moderator(self):
+        return self.role == User.MODERATOR
+
+    @property
+    def is_user(self):
+        return self.role == User.USER
+
+    @property
+    def is_super_user(self):
+        return self.is_superuser
+
+    @cached_property
+    def instance(self):
+        """
+        Строка пользователя из БД. Удаленный или неактивный пользователь
+        получает ответ 401, как при проверке в JWTAuthentication.
+        """
+        try:
+            user = User.objects.get(pk=self.id)
+        except User.DoesNotExist:
+            raise AuthenticationFailed(_('User not found'),
+                                       code='user_not_found')
+        if not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'),
+                                       code='user_inactive')
+        return user
+
+    def __getattr__(self, name):
+        if name.startswith('_') or name == 'token':
+            raise AttributeError(name)
+        return getattr(self.instance, name)
+
+    def __eq__(self, other):
+        return self.id == getattr(other, 'pk', None)
+
+    def __hash__(self):
+        return hash(self.id)
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    Аутентификация по JWT без запроса строки пользователя к БД.
+    Токены без claim роли, выданные до включения режима,
+    обрабатываются как в JWTAuthentication.
+    """
+
+    def get_user(self, validated_token):
+        if ROLE_CLAIM not in validated_token:
+            return super().get_user(validated_token)
+        return StatelessUser(validated_token)
+
+
+def get_user_instance(user):
+    """Возвращает объект модели User для пользователя запроса."""
+    if isinstance(user, StatelessUser):
+        return user.instance
+    return user
@@ -0,0 +1,308 @@
+"""
+Замеры производительности эндпоинтов API.
+
+Каждый сценарий формирует очередной запрос к API; подготовка данных
+для запроса (например, нового кода подтверждения) в замер не входит.
+Запросы выполняются тестовым клиентом Django последовательно.
+"""
+import platform
+import random
+import subprocess
+import threading
+from contextlib import ExitStack
+from itertools import count
+from statistics import mean
+from time import perf_counter
+
+import django
+from django.db import connection, connections
+from django.test import Client
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from reviews.models import Title
+from users.models import User
+
+from .authentication import RoleRefreshToken
+from .metrics import PERCENTILES, percentile
+from .middleware import QueryStats
+from .renderers import FastJSONRenderer, orjson
+from .serializers import TitleGetSerializer
+
+TITLES_URL = '/api/v1/titles/'
+SIGNUP_URL = '/api/v1/auth/signup/'
+TOKEN_URL = '/api/v1/auth/token/'
+ENCODING_PAGE_SIZE = 100
+SEARCH_WORDS = ('клуб', 'война', 'матрица', 'город', 'тайна')
+
+
+def title_list(rng, dataset, number):
+    return 'get', TITLES_URL, None
+
+
+def title_list_page(rng, dataset, number):
+    pages = max(dataset['titles'] // 10, 1)
+    return 'get', f'{TITLES_URL}?page={rng.randint(1, pages)}', None
+
+
+def title_genre_filter(rng, dataset, number):
+    genre = rng.randint(1, max(dataset['genres'], 1))
+    return 'get', f'{TITLES_URL}?match=exact&genre=genre-{genre}', None
+
+
+def title_category_filter(rng, dataset, number):
+    category = rng.randint(1, max(dataset['categories'], 1))
+    path = f'{TITLES_URL}?match=exact&category=category-{category}'
+    return 'get', path, None
+
+
+def title_search(rng, dataset, number):
+    return 'get', f'{TITLES_URL}?search={rng.choice(SEARCH_WORDS)}', None
+
+
+def title_detail(rng, dataset, number):
+    return 'get', f'{TITLES_URL}{rng.randint(1, dataset["titles"])}/', None
+
+
+def title_reviews(rng, dataset, number):
+    title = rng.randint(1, dataset['titles'])
+    return 'get', f'{TITLES_URL}{title}/reviews/', None
+
+
+def review_comments(rng, dataset, number):
+    reviews_per_title = dataset['reviews'] // dataset['titles']
+    title = rng.randint(1, dataset['titles'])
+    review = (title - 1) * reviews_per_title + rng.randint(
+        1, max(reviews_per_title, 1)
+    )
+    return 'get', f'{TITLES_URL}{title}/reviews/{review}/comments/', None
+
+
+def auth_signup(rng, dataset, number):
+    return 'post', SIGNUP_URL, {
+        'username': f'bench{number}', 'email': f'bench{number}@yamdb.fake'
+    }
+
+
+def auth_token(rng, dataset, number):
+    user = User.objects.get(pk=rng.randint(1, dataset['users']))
+    code = user.generate_confirmation_code()
+    return 'post', TOKEN_URL, {
+        'username': user.username, 'confirmation_code': code
+    }
+
+
+def review_create(rng, dataset, number):
+    title = number % dataset['titles'] + 1
+    return 'post', f'{TITLES_URL}{title}/reviews/', {
+        'text': 'Отзыв', 'score': number % 10 + 1
+    }
+
+
+SCENARIOS = {
+    'title_list': title_list,
+    'title_list_page': title_list_page,
+    'title_genre_filter': title_genre_filter,
+    'title_category_filter': title_category_filter,
+    'title_search': title_search,
+    'title_detail': title_detail,
+    'title_reviews': title_reviews,
+    'review_comments': review_comments,
+    'auth_signup': auth_signup,
+    'auth_token': auth_token,
+}
+
+
+def send(client, method, path, data):
+    """Выполняет запрос и возвращает ответ, время и число SQL-запросов."""
+    queries = QueryStats()
+    with ExitStack() as stack:
+        for db in connections.all():
+            stack.enter_context(db.execute_wrapper(queries))
+        start = perf_counter()
+        if data is None:
+            response = getattr(client, method)(path)
+        else:
+            response = getattr(client, method)(
+                path, data, content_type='application/json'
+            )
+        elapsed = perf_counter() - start
+    return response, elapsed, queries.count
+
+
+def summarize(timings, queries, errors):
+    """Сводка замеров сценария: пропускная способность и процентили."""
+    total = sum(timings)
+    summary = {
+        'requests': len(timings),
+        'errors': errors,
+        'throughput_rps': round(len(timings) / total, 1) if total else None,
+        'latency_ms': get_percentiles(timings),
+        'queries': {'mean': round(mean(queries), 2), 'max': max(queries)},
+    }
+    summary['latency_ms']['mean'] = round(total / len(timings) * 1000, 3)
+    return summary
+
+
+def run_scenario(scenario, dataset, requests, warmup=0, seed=0,
+                 numbers=None, client=None):
+    """Выполняет сценарий requests раз после warmup пробных запросов."""
+    client = client or Client()
+    rng = random.Random(seed)
+    numbers = numbers or count(1)
+    timings, queries, errors = [], [], 0
+    for attempt in range(warmup + requests):
+        method, path, data = scenario(rng, dataset, next(numbers))
+        response, elapsed, query_count = send(client, method, path, data)
+        if attempt < warmup:
+            continue
+        timings.append(elapsed)
+        queries.append(query_count)
+        if response.status_code >= 400:
+            errors += 1
+    return summarize(timings, queries, errors)
+
+
+def get_percentiles(timings):
+    timings = sorted(timings)
+    return {
+        f'p{rank}': round(percentile(timings, rank) * 1000, 4)
+        for rank in PERCENTILES
+    }
+
+
+def encoding_benchmark(repeats, page_size=ENCODING_PAGE_SIZE):
+    """
+    Замеряет время кодирования в JSON страницы произведений
+    стандартным JSONRenderer и FastJSONRenderer.
+    """
+    titles = Title.objects.select_related(
+        'category'
+    ).prefetch_related('genre')[:page_size]
+    data = {'count': page_size, 'next': None, 'previous': None,
+            'results': TitleGetSerializer(titles, many=True).data}
+    results = {}
+    for name, renderer in (('stdlib', JSONRenderer()),
+                           ('fast', FastJSONRenderer())):
+        timings = []
+        for _ in range(repeats):
+            start = perf_counter()
+            content = renderer.render(data)
+            timings.append(perf_counter() - start)
+        results[name] = {
+            'bytes': len(content),
+            'latency_ms': get_percentiles(timings),
+        }
+    return {
+        'titles': len(data['results']),
+        'repeats': repeats,
+        'orjson': orjson is not None,
+        'renderers': results,
+    }
+
+
+def concurrency_benchmark(dataset, writers, readers, requests):
+    """
+    Одновременно выполняет в writers потоках POST отзывов (каждый поток
+    от своего нового пользователя, по отзыву на произведение) и в readers
+    потоках GET списка произведений. Каждый поток делает requests
+    запросов; для записи requests не должно превышать числа произведений.
+    """
+    tokens = []
+    for number in range(writers):
+        user = User.objects.create(username=f'writer{number}',
+                                   email=f'writer{number}@yamdb.fake')
+        tokens.append(str(RoleRefreshToken.for_user(user).access_token))
+    timings = {'write': [], 'read': []}
+    errors = {'write': 0, 'read': 0}
+    lock = threading.Lock()
+    barrier = threading.Barrier(writers + readers + 1)
+
+    def work(kind, scenario, token=None):
+        client = Client(raise_request_exception=False)
+        if token:
+            client.defaults['HTTP_AUTHORIZATION'] = f'Bearer {token}'
+        results = []
+        barrier.wait()
+        try:
+            for number in range(requests):
+                response, elapsed, _ = send(
+                    client, *scenario(None, dataset, number)
+                )
+                results.append((elapsed, response.status_code >= 400))
+        finally:
+            connections.close_all()
+            with lock:
+                timings[kind].extend(elapsed for elapsed, _ in results)
+                errors[kind] += sum(failed for _, failed in results)
+
+    threads = [
+        threading.Thread(target=work, args=('write', review_create, token))
+        for token in tokens
+    ] + [
+        threading.Thread(target=work, args=('read', title_list))
+        for _ in range(readers)
+    ]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = perf_counter() - start
+
+    report = {'writers': writers, 'readers': readers,
+              'elapsed_s': round(elapsed, 3)}
+    for kind, kind_timings in timings.items():
+        if not kind_timings:
+            continue
+        report[kind] = {
+            'requests': len(kind_timings),
+            'errors': errors[kind],
+            'throughput_rps': round(len(kind_timings) / elapsed, 1),
+            'latency_ms': get_percentiles(kind_timings),
+        }
+    return report
+
+
+def get_commit():
+    try:
+        return subprocess.run(
+            ('git', 'rev-parse', '--short', 'HEAD'),
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(dataset, scenarios, requests, warmup=0, seed=0,
+                  encoding_repeats=0, writers=0, readers=0):
+    """Выполняет сценарии и возвращает отчет, пригодный для JSON."""
+    numbers = count(1)
+    results = {
+        name: run_scenario(SCENARIOS[name], dataset, requests, warmup,
+                           seed, numbers)
+        for name in scenarios
+    }
+    report = {
+        'meta': {
+            'commit': get_commit(),
+            'created': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'database_engine': connection.settings_dict['ENGINE'],
+            'seed': seed,
+            'requests': requests,
+            'warmup': warmup,
+            'dataset': dataset,
+        },
+        'scenarios': results,
+    }
+    if encoding_repeats:
+        report['encoding'] = encoding_benchmark(encoding_repeats)
+    if writers or readers:
+        report['concurrency'] = concurrency_benchmark(
+            dataset, writers, readers, requests
+        )
+    return report
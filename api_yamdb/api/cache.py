@@ -0,0 +1,77 @@
+"""Кеш ответов API для анонимных запросов на чтение."""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+KEY_PREFIX = 'api-response-cache'
+HITS_KEY = f'{KEY_PREFIX}:hits'
+MISSES_KEY = f'{KEY_PREFIX}:misses'
+
+TITLES = 'titles'
+GENRES = 'genres'
+CATEGORIES = 'categories'
+CACHE_GROUPS = (TITLES, GENRES, CATEGORIES)
+
+
+def version_key(group):
+    return f'{KEY_PREFIX}:version:{group}'
+
+
+def get_versions(groups):
+    """
+    Возвращает текущие версии групп кеша. Отсутствующая версия
+    инициализируется временем в миллисекундах, чтобы после вытеснения
+    ключа из кеша не вернуться к старому номеру версии.
+    """
+    keys = [version_key(group) for group in groups]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, int(time.time() * 1000), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump_versions(*groups):
+    """Делает недействительными все ответы, зависящие от групп."""
+    for group in groups:
+        try:
+            cache.incr(version_key(group))
+        except ValueError:
+            get_versions((group,))
+            cache.incr(version_key(group))
+
+
+def invalidate(*groups):
+    """Сбрасывает группы кеша после фиксации текущей транзакции."""
+    transaction.on_commit(lambda: bump_versions(*groups))
+
+
+def response_key(path, groups):
+    versions = ':'.join(str(version) for version in get_versions(groups))
+    path_hash = hashlib.md5(path.encode('utf-8')).hexdigest()
+    return f'{KEY_PREFIX}:{versions}:{path_hash}'
+
+
+def get_response(key):
+    data = cache.get(key)
+    count_key = MISSES_KEY if data is None else HITS_KEY
+    if not cache.add(count_key, 1, timeout=None):
+        cache.incr(count_key)
+    return data
+
+
+def set_response(key, data):
+    cache.set(key, data, settings.API_RESPONSE_CACHE_TIMEOUT)
+
+
+def get_stats():
+    """Возвращает счетчики попаданий и промахов кеша."""
+    counters = cache.get_many((HITS_KEY, MISSES_KEY))
+    return {
+        'hits': counters.get(HITS_KEY, 0),
+        'misses': counters.get(MISSES_KEY, 0),
+    }
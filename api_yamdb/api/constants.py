@@ -11,6 +11,9 @@ MAX_LEN_EMAIL = 254
 MAX_LEN_USERNAME = 150
 MIN_VALUE_SCORE = 1
 MAX_VALUE_SCORE = 10
+MAX_LEN_FILE_PATH = 512
+MAX_LEN_EMAIL_SUBJECT = 255
+MAX_LEN_VERSION_KEY = 64
 
 RESTRICTED_USERNAMES = ('me', 'admin', 'null')
 HTTP_METHOD_NAMES = ('get', 'post', 'delete', 'head',
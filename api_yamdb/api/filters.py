@@ -1,24 +1,112 @@
+from django.db.models import Exists, OuterRef
 from django_filters import rest_framework as filters
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
 
-from reviews.models import Title
+from reviews.models import Category, Genre, GenreTitle, Title
+from reviews.search import search_titles
+
+SLUG_MATCH_CONTAINS = 'contains'
+SLUG_MATCH_EXACT = 'exact'
+GENRE_OP_OR = 'or'
+GENRE_OP_AND = 'and'
+SLUG_SEPARATOR = ','
+
+
+def split_slugs(value):
+    """Разбивает значение параметра на список уникальных slug."""
+    return list(dict.fromkeys(
+        slug.strip() for slug in value.split(SLUG_SEPARATOR) if slug.strip()
+    ))
+
+
+def title_has_genre(**lookups):
+    """Подзапрос EXISTS по таблице связи жанров и произведений."""
+    return Exists(GenreTitle.objects.filter(title=OuterRef('pk'), **lookups))
 
 
 class TitleFilter(filters.FilterSet):
-    """Фильтр выборки произведений по определенным полям."""
+    """
+    Фильтр выборки произведений по определенным полям.
 
-    category = filters.CharFilter(
-        field_name='category__slug',
-        lookup_expr='icontains'
-    )
-    genre = filters.CharFilter(
-        field_name='genre__slug',
-        lookup_expr='icontains'
-    )
+    По умолчанию genre и category ищут вхождение подстроки в slug.
+    С параметром match=exact они принимают список slug через запятую
+    и сравнивают их точно; для жанров genre_op=and требует наличия
+    всех перечисленных жанров, genre_op=or (по умолчанию) любого из них.
+    """
+
+    category = filters.CharFilter(method='filter_category')
+    genre = filters.CharFilter(method='filter_genre')
     name = filters.CharFilter(
         field_name='name',
         lookup_expr='contains'
     )
+    match = filters.ChoiceFilter(
+        choices=((SLUG_MATCH_CONTAINS, SLUG_MATCH_CONTAINS),
+                 (SLUG_MATCH_EXACT, SLUG_MATCH_EXACT)),
+        method='filter_options'
+    )
+    genre_op = filters.ChoiceFilter(
+        choices=((GENRE_OP_OR, GENRE_OP_OR), (GENRE_OP_AND, GENRE_OP_AND)),
+        method='filter_options'
+    )
 
     class Meta:
         model = Title
         fields = ('category', 'genre', 'name', 'year')
+
+    @property
+    def exact(self):
+        return self.form.cleaned_data.get('match') == SLUG_MATCH_EXACT
+
+    def filter_options(self, queryset, name, value):
+        """Параметры режима фильтрации сами выборку не меняют."""
+        return queryset
+
+    def filter_category(self, queryset, name, value):
+        if not self.exact:
+            return queryset.filter(category__slug__icontains=value)
+        category_ids = list(Category.objects.filter(
+            slug__in=split_slugs(value)
+        ).values_list('id', flat=True))
+        return queryset.filter(category_id__in=category_ids)
+
+    def filter_genre(self, queryset, name, value):
+        if not self.exact:
+            return queryset.filter(
+                title_has_genre(genre__slug__icontains=value)
+            )
+        slugs = split_slugs(value)
+        genre_ids = list(Genre.objects.filter(
+            slug__in=slugs
+        ).values_list('id', flat=True))
+        if not genre_ids:
+            return queryset.none()
+        if self.form.cleaned_data.get('genre_op') != GENRE_OP_AND:
+            return queryset.filter(title_has_genre(genre_id__in=genre_ids))
+        if len(genre_ids) < len(slugs):
+            return queryset.none()
+        for genre_id in genre_ids:
+            queryset = queryset.filter(title_has_genre(genre_id=genre_id))
+        return queryset
+
+
+class TitleSearchFilter(BaseFilterBackend):
+    """
+    Полнотекстовый поиск произведений по названию и описанию.
+    Результаты сортируются по релевантности, поэтому поиск доступен
+    только с постраничной пагинацией: курсорная сортирует выборку
+    по cursor_ordering вьюсета.
+    """
+
+    search_param = 'search'
+    cursor_error = 'Search is not supported with cursor pagination.'
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '').strip()
+        if not query:
+            return queryset
+        paginator = getattr(view, 'paginator', None)
+        if paginator is not None and paginator.use_cursor(request):
+            raise ValidationError({self.search_param: [self.cursor_error]})
+        return search_titles(queryset, query)
@@ -0,0 +1,93 @@
+import json
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (setup_test_environment,
+                               teardown_test_environment)
+
+from api.benchmark import SCENARIOS, run_benchmark
+from reviews.synthetic import generate_dataset
+
+
+class Command(BaseCommand):
+    help = (
+        'Generates a synthetic dataset in a temporary test database, '
+        'runs API scenarios against it and prints a JSON report'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--titles', type=int, default=1000)
+        parser.add_argument('--genres', type=int, default=20)
+        parser.add_argument('--categories', type=int, default=5)
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--reviews-per-title', type=int, default=5)
+        parser.add_argument('--comments-per-review', type=int, default=2)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--requests', type=int, default=200,
+                            help='Measured requests per scenario')
+        parser.add_argument('--warmup', type=int, default=20,
+                            help='Unmeasured requests per scenario')
+        parser.add_argument('--scenario', action='append',
+                            choices=tuple(SCENARIOS),
+                            help='Scenario to run, may be repeated; '
+                                 'all scenarios by default')
+        parser.add_argument('--encoding-repeats', type=int, default=200,
+                            help='Times to encode a page of 100 titles '
+                                 'with each JSON renderer; 0 to skip')
+        parser.add_argument('--writers', type=int, default=0,
+                            help='Threads posting reviews concurrently')
+        parser.add_argument('--readers', type=int, default=0,
+                            help='Threads listing titles concurrently')
+        parser.add_argument('--cache', action='store_true',
+                            help='Keep the anonymous response cache on')
+        parser.add_argument('--output', help='Write the report to a file')
+
+    def handle(self, *args, **options):
+        if options['titles'] < 1 or options['requests'] < 1:
+            raise CommandError('--titles and --requests must be positive.')
+        settings.API_RESPONSE_CACHE_ENABLED = options['cache']
+        # Сценарии auth_* отправляют сотни запросов с одного адреса.
+        settings.API_AUTH_THROTTLE_ENABLED = False
+        concurrent = options['writers'] or options['readers']
+        temp_dir = None
+        if concurrent and connection.vendor == 'sqlite':
+            # Потокам нужна общая БД в файле, а не в памяти.
+            temp_dir = tempfile.mkdtemp()
+            connection.settings_dict['TEST']['NAME'] = os.path.join(
+                temp_dir, 'benchmark.sqlite3'
+            )
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        try:
+            dataset = generate_dataset(
+                titles=options['titles'],
+                genres=options['genres'],
+                categories=options['categories'],
+                users=options['users'],
+                reviews_per_title=options['reviews_per_title'],
+                comments_per_review=options['comments_per_review'],
+                seed=options['seed'],
+            )
+            report = run_benchmark(
+                dataset, options['scenario'] or tuple(SCENARIOS),
+                options['requests'], options['warmup'], options['seed'],
+                options['encoding_repeats'], options['writers'],
+                options['readers']
+            )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+            if temp_dir:
+                shutil.rmtree(temp_dir, ignore_errors=True)
+        report['meta']['response_cache'] = options['cache']
+        output = json.dumps(report, ensure_ascii=False, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(output)
+        self.stdout.write(output)
@@ -1,43 +1,52 @@
-import csv
-
 from django.core.management.base import BaseCommand
 
+from reviews.management.commands.importcsv import (ON_CONFLICT_CHOICES,
+                                                   ON_CONFLICT_SKIP,
+                                                   import_file)
 from users.models import User
 
 
+def prepare_users(rows):
+    """Преобразует строки csv в словари полей пользователя."""
+    return [
+        {
+            'id': row['id'],
+            'username': row['username'],
+            'email': row['email'],
+            'role': row['role'],
+            'bio': row['bio'] if row['bio'] else '',
+            'first_name': row['first_name'] if row['first_name'] else '',
+            'last_name': row['last_name'] if row['last_name'] else '',
+        }
+        for row in rows
+    ]
+
+
 class Command(BaseCommand):
     help = 'Loads users from a CSV file into the database'
 
     def add_arguments(self, parser):
         parser.add_argument('csv_file', type=str,
                             help='The CSV file to load users from')
+        parser.add_argument('--resume', action='store_true',
+                            help='Continue from the last checkpoint')
+        parser.add_argument('--on-conflict', choices=ON_CONFLICT_CHOICES,
+                            default=ON_CONFLICT_SKIP,
+                            help='What to do with users that already exist')
 
     def handle(self, *args, **options):
         self.stdout.write(self.style.SUCCESS('Starting to import users...'))
-        self.import_users(options['csv_file'])
-
-    def import_users(self, csv_file):
-        with open(csv_file, mode='r', newline='', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            users_created = 0
-            for row in reader:
-                _, created = User.objects.get_or_create(
-                    id=row['id'],
-                    defaults={
-                        'username': row['username'],
-                        'email': row['email'],
-                        'role': row['role'],
-                        'bio': row['bio'] if row['bio'] else '',
-                        'first_name': (
-                            row['first_name'] if row['first_name'] else ''),
-                        'last_name': (
-                            row['last_name'] if row['last_name'] else '')
-                    }
-                )
-                if created:
-                    users_created += 1
-            self.stdout.write(
-                self.style.SUCCESS(
-                    f'{users_created} users imported successfully!'
-                )
+        self.import_users(
+            options['csv_file'], options['resume'], options['on_conflict']
+        )
+
+    def import_users(self, csv_file, resume, on_conflict):
+        users_created, users_updated, _ = import_file(
+            csv_file, User, prepare_users, resume, on_conflict
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'{users_created} users imported successfully, '
+                f'{users_updated} updated!'
             )
+        )
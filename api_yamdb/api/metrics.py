@@ -0,0 +1,67 @@
+"""Замеры обработки запросов API в памяти процесса."""
+import math
+import threading
+from collections import deque
+from contextlib import contextmanager
+from time import perf_counter
+
+from django.conf import settings
+
+METRICS = ('wall_ms', 'sql_ms', 'queries', 'serialize_ms', 'render_ms')
+PERCENTILES = (50, 95, 99)
+
+_lock = threading.Lock()
+_samples = deque(maxlen=settings.API_METRICS_BUFFER_SIZE)
+
+
+def record(route, **values):
+    """Сохраняет замер запроса; старые замеры вытесняются новыми."""
+    with _lock:
+        _samples.append((route, values))
+
+
+@contextmanager
+def measure_serialization(request):
+    """
+    Добавляет время выполнения блока ко времени сериализации запроса,
+    если запрос замеряет RequestMetricsMiddleware.
+    """
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        http_request = getattr(request, '_request', request)
+        if hasattr(http_request, 'metrics_serialize_time'):
+            http_request.metrics_serialize_time += perf_counter() - start
+
+
+def clear():
+    with _lock:
+        _samples.clear()
+
+
+def percentile(values, rank):
+    """Процентиль по методу ближайшего ранга для отсортированного списка."""
+    return values[max(math.ceil(rank / 100 * len(values)) - 1, 0)]
+
+
+def get_report():
+    """
+    Возвращает для каждого маршрута число замеров
+    и процентили p50/p95/p99 всех метрик.
+    """
+    with _lock:
+        samples = list(_samples)
+    routes = {}
+    for route, values in samples:
+        routes.setdefault(route, []).append(values)
+    report = {}
+    for route, route_samples in sorted(routes.items()):
+        report[route] = {'count': len(route_samples)}
+        for metric in METRICS:
+            values = sorted(sample[metric] for sample in route_samples)
+            report[route][metric] = {
+                f'p{rank}': round(percentile(values, rank), 3)
+                for rank in PERCENTILES
+            }
+    return report
@@ -0,0 +1,89 @@
+import re
+from contextlib import ExitStack
+from time import perf_counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from . import metrics
+
+UNRESOLVED_ROUTE = '<unresolved>'
+# Якоря ^ и $ регулярных выражений маршрутов DRF, но не [^...].
+ROUTE_ANCHORS = re.compile(r'(?:(?<=^)|(?<=/))\^|\$$')
+
+
+class QueryStats:
+    """Обертка выполнения SQL, считающая запросы и их время."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += perf_counter() - start
+
+
+class RequestMetricsMiddleware:
+    """
+    Замеряет для каждого запроса число SQL-запросов, их суммарное время,
+    время сериализации объектов во вьюсетах, время рендеринга ответа
+    в JSON и общее время обработки и сохраняет
+    замеры в кольцевой буфер (api.metrics). Включается настройкой
+    API_METRICS_ENABLED; при API_METRICS_SERVER_TIMING замеры
+    добавляются в заголовок ответа Server-Timing.
+    """
+
+    def __init__(self, get_response):
+        if not settings.API_METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        start = perf_counter()
+        request.metrics_serialize_time = 0.0
+        request.metrics_render_time = 0.0
+        queries = QueryStats()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(queries))
+            response = self.get_response(request)
+        wall_time = perf_counter() - start
+
+        match = request.resolver_match
+        route = (
+            '/' + ROUTE_ANCHORS.sub('', match.route)
+            if match else UNRESOLVED_ROUTE
+        )
+        metrics.record(
+            f'{request.method} {route}',
+            wall_ms=wall_time * 1000,
+            sql_ms=queries.duration * 1000,
+            queries=queries.count,
+            serialize_ms=request.metrics_serialize_time * 1000,
+            render_ms=request.metrics_render_time * 1000,
+        )
+        if settings.API_METRICS_SERVER_TIMING:
+            response['Server-Timing'] = ', '.join((
+                f'db;dur={queries.duration * 1000:.3f};'
+                f'desc="{queries.count} queries"',
+                f'serialize;dur={request.metrics_serialize_time * 1000:.3f}',
+                f'render;dur={request.metrics_render_time * 1000:.3f}',
+                f'total;dur={wall_time * 1000:.3f}',
+            ))
+        return response
+
+    def process_template_response(self, request, response):
+        """Засекает время рендеринга ответа DRF в JSON."""
+        start = perf_counter()
+
+        def stop_timer(rendered):
+            request.metrics_render_time = perf_counter() - start
+
+        response.add_post_render_callback(stop_timer)
+        return response
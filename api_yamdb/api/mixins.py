@@ -1,9 +1,213 @@
-from rest_framework import filters, mixins, viewsets
+import hashlib
 
+from django.conf import settings
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+from rest_framework import filters, mixins, status, viewsets
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+
+from reviews.models import CollectionVersion
+
+from . import cache, metrics, replicas
 from .permissions import AnonimReadOnly, IsSuperUserOrIsAdminOnly
 
+VALIDATOR_HEADERS = ('ETag', 'Last-Modified')
+
+
+def get_not_modified_response(request, headers):
+    """
+    Возвращает ответ 304 Not Modified, если валидаторы из headers
+    совпадают с условиями запроса, иначе None.
+    """
+    if 'ETag' not in headers:
+        return None
+    response = get_conditional_response(
+        request,
+        etag=headers['ETag'],
+        last_modified=parse_http_date_safe(headers.get('Last-Modified'))
+    )
+    if response is not None:
+        for header, value in headers.items():
+            response[header] = value
+    return response
+
+
+class ConditionalGetMixin:
+    """
+    Добавляет ETag и Last-Modified к ответам на GET-запросы списка
+    и объекта и отвечает 304 Not Modified до выборки и сериализации
+    данных. Валидаторы вычисляются одним запросом к CollectionVersion
+    по ключу get_version_key().
+    """
+
+    def get_version_key(self):
+        raise NotImplementedError(
+            f'{type(self).__name__} must define get_version_key().'
+        )
+
+    def list(self, request, *args, **kwargs):
+        return self.get_conditional_response(super().list, request,
+                                             *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_conditional_response(super().retrieve, request,
+                                             *args, **kwargs)
+
+    def get_validators(self, request):
+        stamps = sorted(CollectionVersion.objects.filter(
+            key__in=(CollectionVersion.GLOBAL, self.get_version_key())
+        ).values_list('key', 'version', 'updated'))
+        fingerprint = ':'.join(
+            [f'{key}={version}' for key, version, _ in stamps]
+            + [request.get_full_path(), request.accepted_media_type]
+        )
+        headers = {'ETag': quote_etag(
+            hashlib.md5(fingerprint.encode('utf-8')).hexdigest()
+        )}
+        if stamps:
+            last_modified = max(updated for _, _, updated in stamps)
+            headers['Last-Modified'] = http_date(last_modified.timestamp())
+        return headers
+
+    def get_conditional_response(self, handler, request, *args, **kwargs):
+        headers = self.get_validators(request)
+        response = get_not_modified_response(request, headers)
+        if response is not None:
+            return response
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            for header, value in headers.items():
+                response[header] = value
+        return response
+
+
+class MeasuredListMixin:
+    """
+    Список, как в ListModelMixin, с замером времени сериализации
+    (api.metrics). Запросы к БД, которые делает сериализатор, входят
+    в это время.
+    """
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(
+            queryset if page is None else page, many=True
+        )
+        with metrics.measure_serialization(request):
+            data = serializer.data
+        if page is None:
+            return Response(data)
+        return self.get_paginated_response(data)
+
+
+class MeasuredListRetrieveMixin(MeasuredListMixin):
+    """Замеряет также время сериализации объекта."""
+
+    def retrieve(self, request, *args, **kwargs):
+        serializer = self.get_serializer(self.get_object())
+        with metrics.measure_serialization(request):
+            data = serializer.data
+        return Response(data)
+
+
+class FlatListMixin:
+    """
+    Отдает GET-запросы списка через flat_serializer_class: строки
+    выбираются через values() и сериализуются без полей DRF.
+    """
+
+    flat_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        if self.flat_serializer_class is None:
+            return super().list(request, *args, **kwargs)
+        serializer = self.flat_serializer_class(
+            context=self.get_serializer_context()
+        )
+        queryset = serializer.get_queryset(
+            self.filter_queryset(self.get_queryset())
+        )
+        page = self.paginate_queryset(queryset)
+        with metrics.measure_serialization(request):
+            data = serializer.serialize(queryset if page is None else page)
+        if page is None:
+            return Response(data)
+        return self.get_paginated_response(data)
+
+
+class CachedListMixin:
+    """
+    Кеширует ответы на анонимные GET-запросы списка по полному URL,
+    включая параметры запроса. cache_groups перечисляет группы,
+    изменение данных которых делает ответ недействительным.
+    Вместе с данными сохраняются ETag и Last-Modified, поэтому
+    условный запрос из кеша получает 304 без обращения к БД.
+    При промахе ответ читается с основной БД: отстающая реплика
+    сохранила бы в кеш старые данные под ключом новой версии.
+    """
+
+    cache_groups = ()
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(super().list, request,
+                                        *args, **kwargs)
+
+    def get_cached_response(self, handler, request, *args, **kwargs):
+        if (not settings.API_RESPONSE_CACHE_ENABLED
+                or request.user.is_authenticated):
+            return handler(request, *args, **kwargs)
+        key = cache.response_key(request.get_full_path(), self.cache_groups)
+        cached = cache.get_response(key)
+        if cached is not None:
+            data, headers = cached
+            response = get_not_modified_response(request, headers)
+            if response is None:
+                response = Response(data, headers=headers)
+            response['X-Cache'] = 'HIT'
+            return response
+        with replicas.read_from_primary():
+            response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            headers = {
+                header: response[header]
+                for header in VALIDATOR_HEADERS if header in response
+            }
+            cache.set_response(key, (response.data, headers))
+            response['X-Cache'] = 'MISS'
+        return response
+
+
+class CachedListRetrieveMixin(CachedListMixin):
+    """Кеширует также ответы на анонимные GET-запросы объекта."""
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(super().retrieve, request,
+                                        *args, **kwargs)
+
+
+class ReplicaReadMixin:
+    """
+    Запросы безопасными методами читают данные с реплики БД
+    (см. api.replicas). Пользователь запроса читается с основной БД:
+    реплика может еще не знать о только что созданном пользователе.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in SAFE_METHODS:
+            return super().dispatch(request, *args, **kwargs)
+        with replicas.read_from_replica():
+            return super().dispatch(request, *args, **kwargs)
+
+    def perform_authentication(self, request):
+        with replicas.read_from_primary():
+            super().perform_authentication(request)
+
 
-class CreateListDestroyViewSet(mixins.CreateModelMixin,
+class CreateListDestroyViewSet(ReplicaReadMixin, CachedListMixin,
+                               MeasuredListMixin,
+                               mixins.CreateModelMixin,
                                mixins.ListModelMixin,
                                mixins.DestroyModelMixin,
                                viewsets.GenericViewSet):
@@ -0,0 +1,157 @@
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (Cursor, CursorPagination,
+                                       PageNumberPagination)
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Курсорная пагинация по составному ключу сортировки.
+
+    Курсор хранит значения всех полей сортировки крайнего объекта
+    страницы, поэтому любая страница выбирается одним запросом
+    без COUNT(*) и OFFSET. Порядок задается атрибутом вьюсета
+    cursor_ordering и должен заканчиваться уникальным полем.
+    """
+
+    ordering = ('-pk',)
+
+    def get_ordering(self, request, queryset, view):
+        return tuple(getattr(view, 'cursor_ordering', self.ordering))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+        ordering = self.ordering
+        if reverse:
+            ordering = tuple(
+                field[1:] if field.startswith('-') else f'-{field}'
+                for field in ordering
+            )
+
+        queryset = queryset.order_by(*ordering)
+        if self.cursor is not None:
+            queryset = self.filter_by_position(
+                queryset, ordering, self.cursor.position
+            )
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        has_more = len(results) > self.page_size
+
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.cursor is not None
+        return self.page
+
+    def filter_by_position(self, queryset, ordering, position):
+        """Оставляет объекты, следующие за позицией курсора."""
+        try:
+            values = json.loads(position)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        fields = [field.lstrip('-') for field in ordering]
+        try:
+            values = self.to_python(queryset.model, fields, values)
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        keyset = Q()
+        for index, field in enumerate(ordering):
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition = dict(zip(fields[:index], values[:index]))
+            condition[f'{fields[index]}__{lookup}'] = values[index]
+            keyset |= Q(**condition)
+        # Условие на первое поле сортировки повторяет keyset, но по нему
+        # СУБД начинает чтение индекса с позиции курсора, а не с начала.
+        lookup = 'lte' if ordering[0].startswith('-') else 'gte'
+        bound = Q(**{f'{fields[0]}__{lookup}': values[0]})
+        return queryset.filter(bound & keyset)
+
+    @staticmethod
+    def to_python(model, fields, values):
+        """Приводит значения курсора к типам полей сортировки."""
+        result = []
+        for name, value in zip(fields, values):
+            field = (model._meta.pk if name == 'pk'
+                     else model._meta.get_field(name))
+            if isinstance(value, (dict, list)) or (
+                value is None and not field.null
+            ):
+                raise ValidationError('Invalid cursor value.')
+            result.append(field.to_python(value))
+        return result
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        position = self.cursor.position if not self.page else (
+            self._get_position_from_instance(self.page[-1], self.ordering)
+        )
+        return self.encode_cursor(
+            Cursor(offset=0, reverse=False, position=position)
+        )
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        position = self.cursor.position if not self.page else (
+            self._get_position_from_instance(self.page[0], self.ordering)
+        )
+        return self.encode_cursor(
+            Cursor(offset=0, reverse=True, position=position)
+        )
+
+    def _get_position_from_instance(self, instance, ordering):
+        fields = [field.lstrip('-') for field in ordering]
+        if isinstance(instance, dict):
+            values = [instance[field] for field in fields]
+        else:
+            values = [getattr(instance, field) for field in fields]
+        return json.dumps(values, default=str)
+
+
+class PageNumberOrKeysetPagination(PageNumberPagination):
+    """
+    Постраничная пагинация с переключением на курсорную.
+
+    Курсорный режим включается параметром ?pagination=cursor,
+    ссылки next/previous в этом режиме содержат параметр cursor.
+    """
+
+    pagination_query_param = 'pagination'
+    cursor_query_param = 'cursor'
+    cursor_pagination_class = KeysetPagination
+
+    def use_cursor(self, request):
+        return (
+            request.query_params.get(self.pagination_query_param) == 'cursor'
+            or self.cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_paginator = None
+        if self.use_cursor(request):
+            self.cursor_paginator = self.cursor_pagination_class()
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view
+            )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
@@ -52,5 +52,5 @@ class IsSuperUserIsAdminIsModeratorIsAuthor(BasePermission):
             or request.user.is_authenticated
             and (request.user.is_admin
                  or request.user.is_moderator
-                 or request.user == obj.author)
+                 or request.user.pk == obj.author_id)
         )
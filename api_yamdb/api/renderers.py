@@ -0,0 +1,52 @@
+from decimal import Decimal
+
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+LINE_SEPARATORS = (
+    ('\u2028'.encode(), b'\\u2028'),
+    ('\u2029'.encode(), b'\\u2029'),
+)
+
+
+def encode_default(obj, encoder=JSONEncoder()):
+    """Кодирует типы, которые orjson не поддерживает сам."""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    return encoder.default(obj)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer на основе orjson. Ответ совпадает с ответом
+    JSONRenderer: компактный UTF-8, даты в ISO 8601 с 'Z' для UTC,
+    Decimal как число, экранированные U+2028 и U+2029.
+    Если orjson не установлен или запрошены отступы, ответ
+    кодируется стандартным JSONRenderer.
+    """
+
+    def use_orjson(self, indent):
+        return (
+            orjson is not None and indent is None
+            and self.compact and not self.ensure_ascii
+        )
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if not self.use_orjson(indent):
+            return super().render(data, accepted_media_type, renderer_context)
+        ret = orjson.dumps(
+            data, default=encode_default,
+            option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+        )
+        for char, escaped in LINE_SEPARATORS:
+            if char in ret:
+                ret = ret.replace(char, escaped)
+        return ret
@@ -0,0 +1,128 @@
+"""
+Чтение с реплик БД для запросов безопасными методами.
+
+Вьюсеты с ReplicaReadMixin выполняют GET-, HEAD- и OPTIONS-запросы
+внутри read_from_replica(): ReplicaRouter отправляет чтения такого
+запроса на одну из реплик settings.DATABASE_REPLICAS, выбирая их
+по кругу и пропуская недоступные. После первой записи запрос до конца
+читает с основной БД, чтобы видеть свои изменения. Остальные запросы
+(в том числе регистрация и выдача токена) работают с основной БД.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from itertools import count
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from django.dispatch import receiver
+
+_routing = ContextVar('replica_routing', default=None)
+_counter = count()
+_health = {}
+_health_lock = threading.Lock()
+
+
+@contextmanager
+def read_from_replica():
+    """Чтения внутри блока идут на реплику до первой записи."""
+    token = _routing.set({'pinned': False})
+    try:
+        yield
+    finally:
+        _routing.reset(token)
+
+
+@contextmanager
+def read_from_primary():
+    """Отключает чтение с реплики внутри блока."""
+    token = _routing.set(None)
+    try:
+        yield
+    finally:
+        _routing.reset(token)
+
+
+def check_replica(alias):
+    """Проверяет, что реплика отвечает на запросы."""
+    try:
+        with connections[alias].cursor() as cursor:
+            cursor.execute('SELECT 1')
+    except DatabaseError:
+        connections[alias].close()
+        return False
+    return True
+
+
+def is_healthy(alias):
+    """
+    Результат проверки реплики, выполняемой не чаще раза
+    в DATABASE_REPLICA_CHECK_INTERVAL секунд.
+    """
+    now = time.monotonic()
+    with _health_lock:
+        checked, healthy = _health.get(alias, (None, None))
+    if (checked is not None
+            and now - checked < settings.DATABASE_REPLICA_CHECK_INTERVAL):
+        return healthy
+    healthy = check_replica(alias)
+    with _health_lock:
+        _health[alias] = (now, healthy)
+    return healthy
+
+
+def get_replica():
+    """Следующая по кругу доступная реплика или None, если таких нет."""
+    replicas = settings.DATABASE_REPLICAS
+    start = next(_counter)
+    for offset in range(len(replicas)):
+        alias = replicas[(start + offset) % len(replicas)]
+        if is_healthy(alias):
+            return alias
+    return None
+
+
+@receiver(setting_changed)
+def reset_health(setting, **kwargs):
+    if setting in ('DATABASE_REPLICAS', 'DATABASE_REPLICA_CHECK_INTERVAL'):
+        with _health_lock:
+            _health.clear()
+
+
+class ReplicaRouter:
+    """
+    Маршрутизатор БД для read_from_replica(). Вне блока решение
+    остается за Django: все запросы идут в основную БД.
+    """
+
+    def db_for_read(self, model, **hints):
+        routing = _routing.get()
+        if routing is None:
+            return None
+        if routing['pinned']:
+            return DEFAULT_DB_ALIAS
+        # Все чтения запроса идут на одну реплику.
+        if 'alias' not in routing:
+            routing['alias'] = get_replica() or DEFAULT_DB_ALIAS
+        return routing['alias']
+
+    def db_for_write(self, model, **hints):
+        routing = _routing.get()
+        if routing is None:
+            return None
+        routing['pinned'] = True
+        # Объект, прочитанный с реплики, сохраняется в основную БД.
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
@@ -1,13 +1,18 @@
 from django.core.validators import MaxLengthValidator, RegexValidator
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
+from rest_framework.settings import api_settings
 from rest_framework.validators import UniqueValidator
 
-from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.models import (Category, Comment, Genre, GenreTitle, Review,
+                            Title, User)
 
 from .constants import (MAX_LEN_EMAIL, MAX_LEN_USERNAME, MAX_VALUE_SCORE,
                         MIN_VALUE_SCORE, RESTRICTED_USERNAMES)
 
+DUPLICATE_REVIEW_MESSAGE = 'Вы уже оставляли отзыв на это произведение'
+
 
 class UserSerializer(serializers.ModelSerializer):
     username = serializers.CharField(
@@ -141,18 +146,23 @@ class ReviewSerializer(serializers.ModelSerializer):
         )
         read_only_fields = ('id', 'title', 'author', 'pub_date')
 
-    def validate(self, data):
-        """Запрещает пользователям оставлять повторные отзывы."""
-
-        if self.context.get('request').method != 'POST':
-            return data
-        author = self.context.get('request').user
-        title_id = self.context.get('view').kwargs.get('title_id')
-        if Review.objects.filter(author=author, title=title_id).exists():
-            raise serializers.ValidationError(
-                'Вы уже оставляли отзыв на это произведение'
-            )
-        return data
+    def create(self, validated_data):
+        """
+        Создает отзыв. Повторный отзыв отклоняет ограничение
+        unique_author_title в БД, без предварительного запроса.
+        """
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError:
+            if not Review.objects.filter(
+                author=validated_data['author'],
+                title=validated_data['title']
+            ).exists():
+                raise
+        raise serializers.ValidationError({
+            api_settings.NON_FIELD_ERRORS_KEY: [DUPLICATE_REVIEW_MESSAGE]
+        })
 
 
 class CommentSerializer(serializers.ModelSerializer):
@@ -168,6 +178,101 @@ class CommentSerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'author', 'pub_date')
 
 
+class FlatSerializer:
+    """
+    Сериализатор списков только для чтения. Выбирает из БД лишь нужные
+    столбцы через values() и строит словари ответа напрямую, без полей
+    DRF для каждой строки. Формат ответа совпадает с serializer_class
+    вьюсета.
+    """
+
+    values = ()
+
+    def __init__(self, context=None):
+        self.context = context or {}
+        self.datetime_field = serializers.DateTimeField()
+
+    def get_queryset(self, queryset):
+        return queryset.values(*self.values, *queryset.query.extra_select)
+
+    def to_representation(self, row):
+        raise NotImplementedError(
+            f'{type(self).__name__} must define to_representation().'
+        )
+
+    def serialize(self, rows):
+        return [self.to_representation(row) for row in rows]
+
+    def format_datetime(self, value):
+        return self.datetime_field.to_representation(value)
+
+
+class TitleFlatSerializer(FlatSerializer):
+    """Быстрая сериализация списка произведений (TitleGetSerializer)."""
+
+    values = ('id', 'name', 'year', 'rating_sum', 'rating_count',
+              'description', 'category__name', 'category__slug')
+
+    def serialize(self, rows):
+        rows = list(rows)
+        genres = {row['id']: [] for row in rows}
+        for title_id, name, slug in GenreTitle.objects.filter(
+            title_id__in=genres
+        ).order_by('genre__name').values_list(
+            'title_id', 'genre__name', 'genre__slug'
+        ):
+            genres[title_id].append({'name': name, 'slug': slug})
+        for row in rows:
+            row['genre'] = genres[row['id']]
+        return super().serialize(rows)
+
+    def to_representation(self, row):
+        return {
+            'id': row['id'],
+            'name': row['name'],
+            'year': row['year'],
+            'rating': (
+                row['rating_sum'] // row['rating_count']
+                if row['rating_count'] else None
+            ),
+            'description': row['description'],
+            'genre': row['genre'],
+            'category': {
+                'name': row['category__name'],
+                'slug': row['category__slug'],
+            } if row['category__slug'] is not None else None,
+        }
+
+
+class ReviewFlatSerializer(FlatSerializer):
+    """Быстрая сериализация списка отзывов (ReviewSerializer)."""
+
+    values = ('id', 'text', 'author__username', 'score', 'pub_date')
+
+    def to_representation(self, row):
+        return {
+            'id': row['id'],
+            'text': row['text'],
+            'author': row['author__username'],
+            'score': row['score'],
+            'pub_date': self.format_datetime(row['pub_date']),
+        }
+
+
+class CommentFlatSerializer(FlatSerializer):
+    """Быстрая сериализация списка комментариев (CommentSerializer)."""
+
+    values = ('id', 'text', 'author__username', 'pub_date')
+
+    def to_representation(self, row):
+        return {
+            'id': row['id'],
+            'text': row['text'],
+            'author': row['author__username'],
+            'pub_date': self.format_datetime(row['pub_date']),
+        }
+
+
 class AuthSignupSerializer(serializers.ModelSerializer):
 
     def validate(self, data):
@@ -0,0 +1,177 @@
+from django.db import connections
+from django.db.models.signals import (m2m_changed, post_delete, post_migrate,
+                                      post_save)
+from django.dispatch import receiver
+
+from reviews import search
+from reviews.models import (Category, CollectionVersion, Comment, Genre,
+                            GenreTitle, Review, Title)
+from users.models import User
+
+from . import cache
+
+MODEL_CACHE_GROUPS = {
+    Title: cache.TITLES,
+    GenreTitle: cache.TITLES,
+    Genre: cache.GENRES,
+    Category: cache.CATEGORIES,
+}
+
+
+def invalidate_cached_responses(sender, **kwargs):
+    """
+    Сбрасывает кеш ответов при изменении кешируемых данных.
+    Подключается в ApiConfig.ready() только к моделям
+    из MODEL_CACHE_GROUPS.
+    """
+    cache.invalidate(MODEL_CACHE_GROUPS[sender])
+
+
+def title_keys(instance, created, deleted):
+    """
+    Удаление произведения меняет и версию его отзывов, чтобы условный
+    запрос к ним получил 404, а не 304.
+    """
+    if deleted:
+        return (CollectionVersion.TITLES,
+                CollectionVersion.reviews_key(instance.pk))
+    return (CollectionVersion.TITLES,)
+
+
+def catalogue_keys(instance, created, deleted):
+    """Новый жанр или категория не видны в списке произведений."""
+    return () if created else (CollectionVersion.TITLES,)
+
+
+def genre_title_keys(instance, created, deleted):
+    return (CollectionVersion.TITLES,)
+
+
+def review_keys(instance, created, deleted):
+    """
+    Версию произведений меняют обработчики рейтинга, и только если
+    изменилась средняя оценка.
+    """
+    keys = [CollectionVersion.reviews_key(instance.title_id)]
+    if deleted:
+        keys.append(CollectionVersion.comments_key(instance.pk))
+    return keys
+
+
+def comment_keys(instance, created, deleted):
+    return (CollectionVersion.comments_key(instance.review_id),)
+
+
+def user_keys(instance, created, deleted):
+    """
+    Имена авторов есть в ответах всех коллекций, поэтому смена
+    username или удаление пользователя меняет общую версию.
+    """
+    stored = getattr(instance, 'stored_username', instance.username)
+    instance.stored_username = instance.username
+    if deleted or stored not in (None, instance.username):
+        return (CollectionVersion.GLOBAL,)
+    return ()
+
+
+COLLECTION_KEYS = {
+    Title: title_keys,
+    Genre: catalogue_keys,
+    Category: catalogue_keys,
+    GenreTitle: genre_title_keys,
+    Review: review_keys,
+    Comment: comment_keys,
+    User: user_keys,
+}
+
+
+def bump_collection_versions(sender, instance, signal, created=False,
+                             **kwargs):
+    """
+    Увеличивает версии коллекций, в которые входит измененный объект.
+    Подключается в ApiConfig.ready() к моделям из COLLECTION_KEYS.
+    """
+    keys = COLLECTION_KEYS[sender](instance, created, signal is post_delete)
+    if keys:
+        CollectionVersion.bump(*keys)
+
+
+def rating_changed(title_id, score_delta, count_delta=0):
+    """
+    Изменяет рейтинг произведения; если средняя оценка изменилась,
+    сбрасывает кеш и версию списка произведений.
+    """
+    if Title.change_rating(title_id, score_delta, count_delta):
+        cache.invalidate(cache.TITLES)
+        CollectionVersion.bump(CollectionVersion.TITLES)
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, created, **kwargs):
+    """Учитывает новую или измененную оценку в рейтинге произведения."""
+    current = (instance.title_id, instance.score)
+    stored = getattr(instance, 'stored_rating', (None, None))
+    if created:
+        rating_changed(instance.title_id, instance.score, 1)
+    elif stored[1] is not None and stored != current:
+        if stored[0] == instance.title_id:
+            rating_changed(instance.title_id, instance.score - stored[1])
+        else:
+            rating_changed(stored[0], -stored[1], -1)
+            rating_changed(instance.title_id, instance.score, 1)
+    instance.stored_rating = current
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(sender, instance, **kwargs):
+    """
+    Исключает оценку удаленного отзыва из рейтинга, в том числе
+    при каскадном удалении вместе с автором.
+    """
+    title_id, score = getattr(instance, 'stored_rating', (None, None))
+    if score is None:
+        title_id, score = instance.title_id, instance.score
+    rating_changed(title_id, -score, -1)
+
+
+@receiver(post_save, sender=Title)
+def index_title(sender, instance, **kwargs):
+    """Обновляет произведение в поисковом индексе."""
+    search.index_title(instance)
+
+
+@receiver(post_delete, sender=Title)
+def remove_title_from_index(sender, instance, **kwargs):
+    """Удаляет произведение из поискового индекса."""
+    search.remove_title(instance.pk)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def invalidate_title_genres(sender, action, **kwargs):
+    """Сбрасывает кеш и версию произведений при изменении их жанров."""
+    if action.startswith('post_'):
+        cache.invalidate(cache.TITLES)
+        CollectionVersion.bump(CollectionVersion.TITLES)
+
+
+@receiver(post_migrate)
+def invalidate_after_migrate(sender, **kwargs):
+    """Сбрасывает весь кеш ответов после миграции или очистки БД."""
+    cache.bump_versions(*cache.CACHE_GROUPS)
+
+
+@receiver(post_migrate)
+def seed_collection_versions(sender, using, **kwargs):
+    """Создает строки общих коллекций после миграции или очистки БД."""
+    if sender.label == 'reviews':
+        CollectionVersion.seed(using)
+
+
+@receiver(post_migrate)
+def rebuild_search_index(sender, using, **kwargs):
+    """
+    Перестраивает поисковый индекс после миграции или очистки БД:
+    flush не удаляет строки из таблицы индекса.
+    """
+    if sender.label == 'reviews':
+        search.rebuild_index(connections[using])
@@ -0,0 +1,147 @@
+"""
+Ограничение частоты запросов регистрации и выдачи токена.
+
+Для каждого эндпоинта (scope) и признака клиента - IP-адреса, username
+и email из тела запроса - считается число запросов в скользящем окне.
+Окно приближается двумя соседними фиксированными окнами: запросы
+прошлого окна учитываются с весом, равным доле прошлого окна, еще
+попадающей в скользящее. Счетчики хранятся в кеше Django и увеличиваются
+атомарным incr, поэтому с общим кешем (Redis, Memcached) ограничение
+действует на все процессы. Проверка выполняется до кода вьюхи,
+то есть до обращений к БД и отправки писем.
+"""
+import hashlib
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.throttling import BaseThrottle
+
+KEY_PREFIX = 'api-throttle'
+PERIODS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 24 * 60 * 60}
+IP = 'ip'
+USERNAME = 'username'
+EMAIL = 'email'
+
+
+def parse_rate(rate):
+    """'<число>/<s|m|h|d>' -> (число запросов, длина окна в секундах)."""
+    num, period = rate.split('/')
+    return int(num), PERIODS[period[0]]
+
+
+def rejections_key(scope, identity):
+    return f'{KEY_PREFIX}:rejected:{scope}:{identity}'
+
+
+def get_stats():
+    """Возвращает число отклоненных запросов по эндпоинтам и признакам."""
+    keys = {
+        (scope, identity): rejections_key(scope, identity)
+        for scope, rates in settings.API_AUTH_THROTTLE_RATES.items()
+        for identity in rates
+    }
+    counters = cache.get_many(keys.values())
+    stats = {}
+    for (scope, identity), key in keys.items():
+        stats.setdefault(scope, {})[identity] = counters.get(key, 0)
+    return stats
+
+
+class Window:
+    """Счетчики текущего и прошлого окна одного признака клиента."""
+
+    def __init__(self, scope, identity, value, limit, duration, now):
+        self.limit = limit
+        self.duration = duration
+        number = int(now // duration)
+        self.elapsed = now - number * duration
+        digest = hashlib.md5(value.encode('utf-8')).hexdigest()
+        base = f'{KEY_PREFIX}:{scope}:{identity}:{digest}:{duration}'
+        self.key = f'{base}:{number}'
+        counters = cache.get_many((f'{base}:{number - 1}', self.key))
+        self.previous = counters.get(f'{base}:{number - 1}', 0)
+        self.current = counters.get(self.key, 0)
+
+    def get_count(self):
+        weight = 1 - self.elapsed / self.duration
+        return self.previous * weight + self.current
+
+    def allows(self):
+        return self.get_count() < self.limit
+
+    def get_wait(self):
+        """Целые секунды до момента, когда запрос будет пропущен."""
+        if self.current < self.limit:
+            wait = self.duration * (
+                1 - (self.limit - self.current) / self.previous
+            ) - self.elapsed
+        else:
+            wait = (self.duration - self.elapsed
+                    + self.duration * (1 - self.limit / self.current))
+        return max(math.ceil(wait), 1)
+
+    def hit(self):
+        # Счетчик живет, пока нужен как текущее и как прошлое окно.
+        if not cache.add(self.key, 1, timeout=self.duration * 2):
+            try:
+                cache.incr(self.key)
+            except ValueError:
+                cache.add(self.key, 1, timeout=self.duration * 2)
+
+
+class SlidingWindowThrottle(BaseThrottle):
+    """
+    Пропускает запрос, если ни по одному признаку клиента не превышена
+    частота из settings.API_AUTH_THROTTLE_RATES[scope].
+    Работает при API_AUTH_THROTTLE_ENABLED.
+    """
+
+    scope = None
+
+    def get_identities(self, request):
+        """Значения признаков клиента; отсутствующие пропускаются."""
+        identities = {IP: self.get_ident(request)}
+        for field in (USERNAME, EMAIL):
+            value = request.data.get(field)
+            if isinstance(value, str) and value.strip():
+                identities[field] = value.strip().lower()
+        return identities
+
+    def allow_request(self, request, view):
+        self.wait_time = None
+        if not settings.API_AUTH_THROTTLE_ENABLED:
+            return True
+        rates = settings.API_AUTH_THROTTLE_RATES.get(self.scope, {})
+        now = time.time()
+        windows = []
+        for identity, value in self.get_identities(request).items():
+            if not value or not rates.get(identity):
+                continue
+            limit, duration = parse_rate(rates[identity])
+            window = Window(self.scope, identity, value, limit, duration, now)
+            if not window.allows():
+                self.wait_time = window.get_wait()
+                self.reject(identity)
+                return False
+            windows.append(window)
+        for window in windows:
+            window.hit()
+        return True
+
+    def reject(self, identity):
+        key = rejections_key(self.scope, identity)
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
+    def wait(self):
+        return self.wait_time
+
+
+class SignupThrottle(SlidingWindowThrottle):
+    scope = 'auth_signup'
+
+
+class TokenThrottle(SlidingWindowThrottle):
+    scope = 'auth_token'
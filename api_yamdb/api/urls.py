@@ -1,7 +1,7 @@
 from django.urls import include, path
 from rest_framework import routers
 
-from api.views import auth_signup, auth_token
+from api.views import api_metrics, auth_signup, auth_token
 
 from .views import (CategoriesViewSet, CommentViewSet, GenresViewSet,
                     ReviewViewSet, TitlesViewSet, UserViewSet)
@@ -22,5 +22,6 @@ v1_router.register(
 urlpatterns = [
     path('v1/auth/signup/', auth_signup, name='signup'),
     path('v1/auth/token/', auth_token, name='token'),
+    path('v1/metrics/', api_metrics, name='metrics'),
     path('v1/', include(v1_router.urls),),
 ]
@@ -1,30 +1,40 @@
 from django.conf import settings
-from django.core.mail import send_mail
-from django.db.models import Avg
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, permissions, status, viewsets
-from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.decorators import (action, api_view,
+                                       authentication_classes,
+                                       permission_classes, throttle_classes)
 from rest_framework.permissions import AllowAny, IsAuthenticatedOrReadOnly
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
 
+from api.authentication import RoleRefreshToken, get_user_instance
 from api.permissions import (AnonimReadOnly, IsAdminOnly, IsAdminOrReadOnly,
                              IsSuperUserIsAdminIsModeratorIsAuthor,
                              IsSuperUserOrIsAdminOnly)
-from reviews.models import Category, Genre, Review, Title, User
+from reviews.models import (Category, CollectionVersion, Comment, Genre,
+                            Review, Title, User)
+from users.mail import queue_mail
 
-from .filters import TitleFilter
-from .mixins import CreateListDestroyViewSet
+from .filters import TitleFilter, TitleSearchFilter
+from . import cache, metrics, throttling
+from .mixins import (CachedListRetrieveMixin, ConditionalGetMixin,
+                     CreateListDestroyViewSet, FlatListMixin,
+                     MeasuredListRetrieveMixin, ReplicaReadMixin)
+from .pagination import PageNumberOrKeysetPagination
 from .serializers import (AuthSignupSerializer, AuthTokenSerializer,
-                          CategorySerializer, CommentSerializer,
-                          GenreSerializer, ReviewSerializer,
-                          TitleGetSerializer, TitleSerializer, UserSerializer)
+                          CategorySerializer, CommentFlatSerializer,
+                          CommentSerializer, GenreSerializer,
+                          ReviewFlatSerializer, ReviewSerializer,
+                          TitleFlatSerializer, TitleGetSerializer,
+                          TitleSerializer, UserSerializer)
 from .constants import HTTP_METHOD_NAMES
 
 
 @api_view(('POST',))
+@authentication_classes(())
 @permission_classes((AllowAny,))
+@throttle_classes((throttling.SignupThrottle,))
 def auth_signup(request):
     """Регистрация новых пользователей."""
     serializer = AuthSignupSerializer(data=request.data)
@@ -33,12 +43,11 @@ def auth_signup(request):
     ).first()
     if user and user.username == request.data.get('username'):
         confirmation_code = user.generate_confirmation_code()
-        send_mail(
+        queue_mail(
             'Your New Confirmation Code',
             f'Your new confirmation code is {confirmation_code}',
             settings.DEFAULT_FROM_EMAIL,
             (user.email,),
-            fail_silently=False,
         )
         return Response({'email': user.email, 'username': user.username},
                         status=status.HTTP_200_OK)
@@ -51,19 +60,20 @@ def auth_signup(request):
     if serializer.is_valid():
         user = serializer.save()
         confirmation_code = user.generate_confirmation_code()
-        send_mail(
+        queue_mail(
             'Your Confirmation Code',
             f'Your confirmation code is {confirmation_code}',
             settings.DEFAULT_FROM_EMAIL,
             (user.email,),
-            fail_silently=False,
         )
         return Response(serializer.data, status=status.HTTP_200_OK)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
 @api_view(('POST',))
+@authentication_classes(())
 @permission_classes((AllowAny,))
+@throttle_classes((throttling.TokenThrottle,))
 def auth_token(request):
     serializer = AuthTokenSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
@@ -80,7 +90,7 @@ def auth_token(request):
                         status=status.HTTP_404_NOT_FOUND)
 
     if user.check_confirmation_code(confirmation_code):
-        refresh = RefreshToken.for_user(user)
+        refresh = RoleRefreshToken.for_user(user)
         return Response(
             {'refresh': str(refresh), 'access': str(refresh.access_token)},
             status=status.HTTP_200_OK
@@ -89,7 +99,22 @@ def auth_token(request):
                     status=status.HTTP_400_BAD_REQUEST)
 
 
-class UserViewSet(viewsets.ModelViewSet):
+@api_view(('GET',))
+@permission_classes((IsAdminOnly,))
+def api_metrics(request):
+    """
+    Процентили замеров запросов по маршрутам, счетчики кеша
+    и число запросов, отклоненных ограничением частоты.
+    """
+    return Response({
+        'enabled': settings.API_METRICS_ENABLED,
+        'routes': metrics.get_report(),
+        'cache': cache.get_stats(),
+        'throttling': throttling.get_stats(),
+    })
+
+
+class UserViewSet(MeasuredListRetrieveMixin, viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     lookup_field = 'username'
@@ -106,10 +131,11 @@ class UserViewSet(viewsets.ModelViewSet):
         permission_classes=(permissions.IsAuthenticated, IsAdminOrReadOnly),
     )
     def me(self, request):
-        serializer = UserSerializer(request.user)
+        user = get_user_instance(request.user)
+        serializer = UserSerializer(user)
         if request.method == 'PATCH':
             serializer = UserSerializer(
-                request.user, data=request.data, partial=True,
+                user, data=request.data, partial=True,
                 context={'request': request})
             serializer.is_valid(raise_exception=True)
             serializer.save()
@@ -117,15 +143,26 @@ class UserViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class TitlesViewSet(viewsets.ModelViewSet):
-    queryset = Title.objects.annotate(rating=Avg('reviews__score'))
+class TitlesViewSet(ReplicaReadMixin, CachedListRetrieveMixin,
+                    ConditionalGetMixin, FlatListMixin,
+                    MeasuredListRetrieveMixin, viewsets.ModelViewSet):
+    queryset = Title.objects.select_related(
+        'category'
+    ).prefetch_related('genre')
     serializer_class = TitleSerializer
+    flat_serializer_class = TitleFlatSerializer
     permission_classes = (AnonimReadOnly | IsSuperUserOrIsAdminOnly,)
-    filter_backends = (DjangoFilterBackend,)
+    filter_backends = (DjangoFilterBackend, TitleSearchFilter)
     filterset_class = TitleFilter
+    pagination_class = PageNumberOrKeysetPagination
+    cursor_ordering = ('-year', 'name', 'id')
+    cache_groups = (cache.TITLES, cache.GENRES, cache.CATEGORIES)
     http_method_names = HTTP_METHOD_NAMES
     ordering_fields = ('name', 'rating', 'year', 'genre', 'category')
 
+    def get_version_key(self):
+        return CollectionVersion.TITLES
+
     def get_serializer_class(self):
         if self.request.method == 'GET':
             return TitleGetSerializer
@@ -135,56 +172,104 @@ class TitlesViewSet(viewsets.ModelViewSet):
 class GenresViewSet(CreateListDestroyViewSet):
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
+    cache_groups = (cache.GENRES,)
 
 
 class CategoriesViewSet(CreateListDestroyViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    cache_groups = (cache.CATEGORIES,)
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(ReplicaReadMixin, ConditionalGetMixin, FlatListMixin,
+                    MeasuredListRetrieveMixin, viewsets.ModelViewSet):
     serializer_class = ReviewSerializer
+    flat_serializer_class = ReviewFlatSerializer
     permission_classes = (IsAuthenticatedOrReadOnly,
                           IsSuperUserIsAdminIsModeratorIsAuthor)
+    pagination_class = PageNumberOrKeysetPagination
+    cursor_ordering = ('-pub_date', '-id')
     http_method_names = HTTP_METHOD_NAMES
 
+    def get_version_key(self):
+        return CollectionVersion.reviews_key(self.kwargs.get('title_id'))
+
     def get_title(self):
-        """Возвращает объект текущего произведения."""
-        title_id = self.kwargs.get('title_id')
-        return get_object_or_404(Title, pk=title_id)
+        """Возвращает объект текущего произведения; запрашивается
+        не более одного раза за запрос."""
+        if not hasattr(self, '_title'):
+            self._title = get_object_or_404(
+                Title, pk=self.kwargs.get('title_id')
+            )
+        return self._title
 
     def get_queryset(self):
-        """Возвращает queryset c отзывами для текущего произведения."""
-        return self.get_title().reviews.all()
+        """Возвращает queryset c отзывами для текущего произведения.
+        Само произведение при этом не запрашивается."""
+        return Review.objects.filter(title_id=self.kwargs.get('title_id'))
+
+    def paginate_queryset(self, queryset):
+        """Пустая страница может означать несуществующее произведение:
+        только в этом случае оно проверяется отдельным запросом."""
+        page = super().paginate_queryset(queryset)
+        if not page:
+            self.get_title()
+        return page
 
     def perform_create(self, serializer):
         """Создает отзыв для текущего произведения,
-        где автором является текущий пользователь."""
+        где автором является текущий пользователь.
+        Рейтинг произведения изменяют сигналы модели Review."""
         serializer.save(
-            author=self.request.user,
+            author=get_user_instance(self.request.user),
             title=self.get_title()
         )
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(ReplicaReadMixin, ConditionalGetMixin, FlatListMixin,
+                     MeasuredListRetrieveMixin, viewsets.ModelViewSet):
     serializer_class = CommentSerializer
+    flat_serializer_class = CommentFlatSerializer
     permission_classes = (IsAuthenticatedOrReadOnly,
                           IsSuperUserIsAdminIsModeratorIsAuthor)
+    pagination_class = PageNumberOrKeysetPagination
+    cursor_ordering = ('-pub_date', '-id')
     http_method_names = HTTP_METHOD_NAMES
 
+    def get_version_key(self):
+        return CollectionVersion.comments_key(self.kwargs.get('review_id'))
+
     def get_review(self):
-        """Возвращает объект текущего отзыва."""
-        review_id = self.kwargs.get('review_id')
-        return get_object_or_404(Review, pk=review_id)
+        """Возвращает объект текущего отзыва к текущему произведению;
+        запрашивается не более одного раза за запрос."""
+        if not hasattr(self, '_review'):
+            self._review = get_object_or_404(
+                Review,
+                pk=self.kwargs.get('review_id'),
+                title_id=self.kwargs.get('title_id')
+            )
+        return self._review
 
     def get_queryset(self):
-        """Возвращает queryset c комментариями для текущего отзыва."""
-        return self.get_review().comments.all()
+        """Возвращает queryset c комментариями для текущего отзыва.
+        Принадлежность отзыва произведению проверяется в том же запросе."""
+        return Comment.objects.filter(
+            review_id=self.kwargs.get('review_id'),
+            review__title_id=self.kwargs.get('title_id')
+        )
+
+    def paginate_queryset(self, queryset):
+        """Пустая страница может означать несуществующий отзыв:
+        только в этом случае он проверяется отдельным запросом."""
+        page = super().paginate_queryset(queryset)
+        if not page:
+            self.get_review()
+        return page
 
     def perform_create(self, serializer):
         """Создает комментарий для текущего отзыва,
         где автором является текущий пользователь."""
         serializer.save(
-            author=self.request.user,
+            author=get_user_instance(self.request.user),
             review=self.get_review()
         )
@@ -0,0 +1,116 @@
+"""
+Бэкенд PostgreSQL с проверкой соединений и пулом соединений.
+
+CONN_HEALTH_CHECKS=True в настройках БД включает проверку постоянного
+соединения перед первым обращением к БД в каждом запросе.
+
+Если в настройках БД задан ключ POOL ({'MIN_SIZE': ..., 'MAX_SIZE': ...}),
+соединения берутся из пула psycopg2, общего для потоков процесса,
+и при закрытии возвращаются в него. Запрос не тратит время на установку
+соединения, а число соединений процесса ограничено MAX_SIZE. В пуле
+хранится до MIN_SIZE свободных соединений, лишние закрываются. Если
+заняты все MAX_SIZE соединений, поток ждет освобождения соединения
+до TIMEOUT секунд, после чего обращение к БД завершается ошибкой,
+поэтому MAX_SIZE должен быть не меньше числа потоков процесса.
+"""
+import os
+import threading
+import time
+
+from django.db.backends.postgresql import base
+from psycopg2 import extras, pool
+
+from api_yamdb.database import HealthCheckMixin
+
+_pools = {}
+_pools_lock = threading.Lock()
+# Пауза между попытками взять соединение из исчерпанного пула, секунды.
+RETRY_DELAY = 0.01
+MAX_RETRY_DELAY = 0.1
+
+
+def get_pool(alias, conn_params, options):
+    """Пул соединений БД alias в текущем процессе."""
+    # Рабочие процессы после fork создают собственные пулы.
+    key = (alias, os.getpid())
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = pool.ThreadedConnectionPool(
+                options['MIN_SIZE'], options['MAX_SIZE'], **conn_params
+            )
+        return _pools[key]
+
+
+def is_alive(connection):
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        if not connection.autocommit:
+            connection.rollback()
+    except base.Database.Error:
+        return False
+    return True
+
+
+class DatabaseWrapper(HealthCheckMixin, base.DatabaseWrapper):
+
+    connection_pool = None
+
+    def get_new_connection(self, conn_params):
+        options = self.settings_dict.get('POOL')
+        if not options:
+            return super().get_new_connection(conn_params)
+        self.connection_pool = get_pool(self.alias, conn_params, options)
+        connection = self.checkout()
+        # Та же настройка соединения, что в стандартном бэкенде.
+        self.isolation_level = self.settings_dict['OPTIONS'].get(
+            'isolation_level', connection.isolation_level
+        )
+        if self.isolation_level != connection.isolation_level:
+            connection.set_session(isolation_level=self.isolation_level)
+        extras.register_default_jsonb(
+            conn_or_curs=connection, loads=lambda x: x
+        )
+        return connection
+
+    def checkout(self):
+        """
+        Берет соединение из пула. При CONN_HEALTH_CHECKS разорванные
+        соединения закрываются, и берется следующее.
+        """
+        for _ in range(self.connection_pool.maxconn):
+            connection = self.getconn()
+            if (
+                not self.settings_dict.get('CONN_HEALTH_CHECKS')
+                or is_alive(connection)
+            ):
+                return connection
+            self.connection_pool.putconn(connection, close=True)
+        return self.getconn()
+
+    def getconn(self):
+        """
+        Берет соединение из пула; пока пул исчерпан, повторяет попытки
+        не дольше POOL['TIMEOUT'] секунд.
+        """
+        timeout = self.settings_dict['POOL'].get('TIMEOUT', 0)
+        deadline = time.monotonic() + timeout
+        delay = RETRY_DELAY
+        while True:
+            try:
+                return self.connection_pool.getconn()
+            except pool.PoolError:
+                if (
+                    self.connection_pool.closed
+                    or time.monotonic() + delay > deadline
+                ):
+                    raise
+            time.sleep(delay)
+            delay = min(delay * 2, MAX_RETRY_DELAY)
+
+    def _close(self):
+        if self.connection is None or self.connection_pool is None:
+            return super()._close()
+        with self.wrap_database_errors:
+            # Незавершенная транзакция откатывается пулом.
+            self.connection_pool.putconn(self.connection)
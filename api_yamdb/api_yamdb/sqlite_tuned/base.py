@@ -0,0 +1,34 @@
+"""
+Бэкенд SQLite для работы под нагрузкой.
+
+Каждое новое соединение получает PRAGMA из ключа PRAGMAS настроек БД
+(по умолчанию DEFAULT_PRAGMAS): журнал WAL, synchronous=NORMAL,
+отображение файла в память, увеличенный кеш страниц и ожидание
+снятия блокировки. Транзакции начинаются с BEGIN IMMEDIATE:
+блокировка на запись берется сразу, и транзакция ждет ее
+busy_timeout, а не падает с "database is locked" при попытке
+перейти от чтения к записи.
+"""
+from django.db.backends.sqlite3 import base
+
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+    'busy_timeout': 20000,
+    'temp_store': 'MEMORY',
+}
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        pragmas = self.settings_dict.get('PRAGMAS', DEFAULT_PRAGMAS)
+        for name, value in pragmas.items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute('BEGIN IMMEDIATE')
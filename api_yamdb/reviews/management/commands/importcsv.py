@@ -1,12 +1,18 @@
 import csv
 import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
+from time import perf_counter
 
-from django.core.management import BaseCommand
-from django.db import IntegrityError
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError, call_command
+from django.core.management.color import no_style
+from django.db import IntegrityError, connection, connections, transaction
 
-from api_yamdb.settings import CSV_FILES_DIR
-from reviews.models import (Category, Comment, Genre, GenreTitle, Review,
-                            Title, User)
+from api import cache
+from reviews import search
+from reviews.models import (Category, CollectionVersion, Comment, Genre,
+                            GenreTitle, ImportCheckpoint, Review, Title, User)
 
 FILES_CLASSES = {
     'category': Category,
@@ -26,53 +32,337 @@ FIELDS = {
     'review_id': ('review', Review),
 }
 
+BATCH_SIZE = 1000
+PRELOAD_IDS_LIMIT = 100_000
+LOOKUP_CHUNK_SIZE = 500
+SINGLE_WRITER_VENDORS = ('sqlite',)
+ON_CONFLICT_ERROR = 'error'
+ON_CONFLICT_SKIP = 'skip'
+ON_CONFLICT_UPDATE = 'update'
+ON_CONFLICT_CHOICES = (ON_CONFLICT_ERROR, ON_CONFLICT_SKIP, ON_CONFLICT_UPDATE)
 
-def open_csv_file(file_name):
-    """Менеджер контекста для открытия csv-файлов."""
+
+def get_csv_path(file_name):
+    """Возвращает путь к csv-файлу или None, если файла нет."""
     csv_file = file_name + '.csv'
-    csv_path = os.path.join(CSV_FILES_DIR, csv_file)
-    try:
-        with (open(csv_path, encoding='utf-8')) as file:
-            return list(csv.reader(file))
-    except FileNotFoundError:
+    csv_path = os.path.join(settings.CSV_FILES_DIR, csv_file)
+    if not os.path.isfile(csv_path):
         print(f'Файл {csv_file} не найден.')
-        return
+        return None
+    return csv_path
+
+
+def read_csv_rows(csv_path, offset=0):
+    """
+    Построчно читает csv-файл, не загружая его в память целиком.
+    Возвращает пары (строка, смещение в байтах после строки); при
+    ненулевом offset чтение продолжается с этой позиции после заголовка.
+    """
+    with open(csv_path, 'rb') as file:
+        lines = (line.decode('utf-8') for line in iter(file.readline, b''))
+        reader = csv.reader(lines)
+        header = next(reader, None)
+        if offset:
+            file.seek(offset)
+        for row in reader:
+            yield dict(zip(header, row)), file.tell()
+
+
+def iter_batches(rows, size):
+    """Разбивает поток строк на пачки фиксированного размера."""
+    rows = iter(rows)
+    while batch := list(islice(rows, size)):
+        yield batch
+
+
+def to_pk(value):
+    """Приводит значение из csv к первичному ключу."""
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+
+def get_known_ids(model, known_ids):
+    """
+    Возвращает кешированное множество первичных ключей таблицы.
+    Для таблиц больше PRELOAD_IDS_LIMIT возвращает None: их ключи
+    проверяются запросом на каждую пачку, чтобы не держать их в памяти.
+    """
+    if model not in known_ids:
+        ids = None
+        if model.objects.count() <= PRELOAD_IDS_LIMIT:
+            ids = set(model.objects.values_list('pk', flat=True))
+        known_ids[model] = ids
+    return known_ids[model]
+
+
+def fetch_existing_ids(model, ids):
+    """Возвращает те ключи из ids, которые есть в таблице."""
+    ids = list(ids)
+    existing = set()
+    for start in range(0, len(ids), LOOKUP_CHUNK_SIZE):
+        existing.update(model.objects.filter(
+            pk__in=ids[start:start + LOOKUP_CHUNK_SIZE]
+        ).values_list('pk', flat=True))
+    return existing
+
+
+def change_foreign_values(batch, known_ids):
+    """
+    Заменяет значения внешних ключей пачки строк на идентификаторы
+    связанных объектов. Строки, ссылающиеся на отсутствующие объекты,
+    в результат не попадают.
+    """
+    columns = [column for column in FIELDS if column in batch[0]]
+    existing = {}
+    for column in columns:
+        model = FIELDS[column][1]
+        ids = get_known_ids(model, known_ids)
+        if ids is None:
+            ids = fetch_existing_ids(
+                model, {to_pk(row[column]) for row in batch} - {None}
+            )
+        existing[column] = ids
+
+    result = []
+    for data_csv in batch:
+        data_csv_copy = data_csv.copy()
+        for column in columns:
+            field_name = FIELDS[column][0]
+            field_value = data_csv_copy.pop(column)
+            pk = None
+            if field_value != '':
+                pk = to_pk(field_value)
+                if pk not in existing[column]:
+                    break
+            data_csv_copy[f'{field_name}_id'] = pk
+        else:
+            result.append(data_csv_copy)
+    return result
+
+
+def reset_sequences(class_name):
+    """Синхронизирует счетчик первичных ключей после вставки с id."""
+    statements = connection.ops.sequence_reset_sql(no_style(), (class_name,))
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
 
 
-def change_foreign_values(data_csv):
-    """Изменяет значения."""
-    data_csv_copy = data_csv.copy()
-    for field_key, field_value in data_csv.items():
-        if field_key in FIELDS.keys():
-            field_key0 = FIELDS[field_key][0]
-            data_csv_copy[field_key0] = FIELDS[field_key][1].objects.get(
-                pk=field_value)
-    return data_csv_copy
+def get_checkpoint(csv_path, resume):
+    """
+    Возвращает контрольную точку файла. Без resume, а также если файл
+    стал меньше загруженной части, загрузка начинается сначала.
+    Если загруженный файл изменил размер, загрузка продолжается
+    с сохраненного смещения: так подгружаются дописанные строки.
+    """
+    file_size = os.path.getsize(csv_path)
+    checkpoint, _ = ImportCheckpoint.objects.get_or_create(
+        file_path=os.path.abspath(csv_path)
+    )
+    if not resume or checkpoint.offset > file_size:
+        checkpoint.offset = checkpoint.rows = 0
+        checkpoint.completed = False
+    elif checkpoint.file_size != file_size:
+        checkpoint.completed = False
+    checkpoint.file_size = file_size
+    checkpoint.save()
+    return checkpoint
 
 
-def load_csv(file_name, class_name):
-    """Осуществляет загрузку csv-файлов."""
+def save_objects(class_name, data, on_conflict):
+    """
+    Сохраняет пачку объектов из словарей полей. Объекты с уже
+    существующими первичными ключами пропускаются или обновляются
+    в зависимости от on_conflict.
+    Возвращает количество созданных и обновленных объектов.
+    """
+    objects = [class_name(**data_csv) for data_csv in data]
+    if on_conflict == ON_CONFLICT_ERROR:
+        class_name.objects.bulk_create(objects)
+        return len(objects), 0
+    pk_field = class_name._meta.pk
+    for obj in objects:
+        obj.pk = pk_field.to_python(obj.pk)
+    existing = fetch_existing_ids(class_name, {obj.pk for obj in objects})
+    class_name.objects.bulk_create(
+        [obj for obj in objects if obj.pk not in existing]
+    )
+    if on_conflict == ON_CONFLICT_SKIP or not existing:
+        return len(objects) - len(existing), 0
+    fields = {
+        class_name._meta.get_field(key).name
+        for data_csv in data
+        for key in data_csv
+    } - {pk_field.name}
+    class_name.objects.bulk_update(
+        [obj for obj in objects if obj.pk in existing], fields
+    )
+    return len(objects) - len(existing), len(existing)
+
+
+def import_file(csv_path, class_name, prepare_batch, resume=False,
+                on_conflict=ON_CONFLICT_ERROR):
+    """
+    Загружает csv-файл пачками по BATCH_SIZE строк. Каждая пачка
+    фиксируется в одной транзакции вместе с контрольной точкой, поэтому
+    прерванную загрузку можно продолжить с флагом resume.
+    prepare_batch превращает пачку строк в список словарей полей модели.
+    Возвращает количество созданных, обновленных и пропущенных строк.
+    """
+    checkpoint = get_checkpoint(csv_path, resume)
+    created = updated = skipped = 0
+    if checkpoint.completed:
+        return created, updated, skipped
+    rows = read_csv_rows(csv_path, checkpoint.offset)
+    for batch in iter_batches(rows, BATCH_SIZE):
+        data = prepare_batch([row for row, _ in batch])
+        with transaction.atomic():
+            batch_created, batch_updated = save_objects(
+                class_name, data, on_conflict
+            )
+            checkpoint.offset = batch[-1][1]
+            checkpoint.rows += len(batch)
+            checkpoint.save()
+        created += batch_created
+        updated += batch_updated
+        skipped += len(batch) - batch_created - batch_updated
+    reset_sequences(class_name)
+    checkpoint.completed = True
+    checkpoint.save()
+    return created, updated, skipped
+
+
+def load_csv(file_name, class_name, known_ids, resume=False,
+             on_conflict=ON_CONFLICT_ERROR):
+    """Осуществляет потоковую загрузку csv-файла в таблицу."""
     table_not_loaded = f'Таблица {class_name.__qualname__} не загружена.'
     table_loaded = f'Таблица {class_name.__qualname__} загружена.'
-    data = open_csv_file(file_name)
-    rows = data[1:]
-    for row in rows:
-        data_csv = dict(zip(data[0], row))
-        data_csv = change_foreign_values(data_csv)
-        try:
-            table = class_name(**data_csv)
-            table.save()
-        except (ValueError, IntegrityError) as error:
-            print(f'Ошибка в загружаемых данных. {error}. '
-                  f'{table_not_loaded}')
-            break
-    print(table_loaded)
+    csv_path = get_csv_path(file_name)
+    if not csv_path:
+        print(table_not_loaded)
+        return
+    started = perf_counter()
+    try:
+        created, updated, skipped = import_file(
+            csv_path, class_name,
+            lambda batch: change_foreign_values(batch, known_ids),
+            resume, on_conflict
+        )
+    except (ValueError, IntegrityError) as error:
+        print(f'Ошибка в загружаемых данных. {error}. '
+              f'{table_not_loaded} Загрузку можно продолжить '
+              'с флагом --resume.')
+        return
+    finally:
+        known_ids.pop(class_name, None)
+    elapsed = perf_counter() - started
+    print(f'{table_loaded} Создано: {created}, обновлено: {updated}, '
+          f'пропущено: {skipped}, '
+          f'{(created + updated) / elapsed:.0f} строк/с.')
+
+
+def get_dependencies(files_classes):
+    """
+    Строит граф зависимостей файлов по внешним ключам моделей:
+    таблица загружается после таблиц, на которые она ссылается.
+    """
+    file_names = {model: key for key, model in files_classes.items()}
+    return {
+        key: {
+            file_names[field.related_model]
+            for field in model._meta.get_fields()
+            if field.many_to_one
+            and field.related_model in file_names
+            and field.related_model is not model
+        }
+        for key, model in files_classes.items()
+    }
+
+
+def get_ready(pending, done, running=()):
+    """Возвращает файлы, все зависимости которых уже загружены."""
+    ready = [key for key, dependencies in pending.items()
+             if dependencies <= done]
+    if pending and not ready and not running:
+        raise CommandError('Циклическая зависимость между таблицами.')
+    return ready
+
+
+def load_table(file_name, class_name, known_ids, **options):
+    """Загружает таблицу, закрывая соединение с БД в рабочем потоке."""
+    print(f'Загрузка таблицы {class_name.__qualname__}')
+    try:
+        load_csv(file_name, class_name, known_ids, **options)
+    finally:
+        connections.close_all()
+
+
+def load_tables(files_classes, workers, **options):
+    """
+    Загружает таблицы в порядке графа зависимостей; независимые
+    таблицы загружаются одновременно в workers потоках.
+    Остальные параметры передаются в load_csv.
+    """
+    known_ids = {}
+    pending = get_dependencies(files_classes)
+    done = set()
+    if workers == 1:
+        while pending:
+            for key in get_ready(pending, done):
+                del pending[key]
+                print(f'Загрузка таблицы {files_classes[key].__qualname__}')
+                load_csv(key, files_classes[key], known_ids, **options)
+                done.add(key)
+        return
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        running = {}
+        while pending or running:
+            for key in get_ready(pending, done, running):
+                del pending[key]
+                future = executor.submit(
+                    load_table, key, files_classes[key], known_ids, **options
+                )
+                running[future] = key
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                future.result()
+                done.add(running.pop(future))
 
 
 class Command(BaseCommand):
     """Класс загрузки тестовой базы данных."""
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help='Number of tables loaded concurrently'
+        )
+        parser.add_argument(
+            '--resume', action='store_true',
+            help='Continue each file from its last checkpoint'
+        )
+        parser.add_argument(
+            '--on-conflict', choices=ON_CONFLICT_CHOICES,
+            default=ON_CONFLICT_ERROR,
+            help='What to do with rows whose primary key already exists'
+        )
+
     def handle(self, *args, **options):
-        for key, value in FILES_CLASSES.items():
-            print(f'Загрузка таблицы {value.__qualname__}')
-            load_csv(key, value)
+        workers = options['workers']
+        if workers < 1:
+            raise CommandError('--workers must be a positive integer.')
+        if workers > 1 and connection.vendor in SINGLE_WRITER_VENDORS:
+            print(f'{connection.vendor} не поддерживает одновременную запись, '
+                  'таблицы будут загружены последовательно.')
+            workers = 1
+        load_tables(
+            FILES_CLASSES, workers,
+            resume=options['resume'], on_conflict=options['on_conflict']
+        )
+        call_command('recalculate_ratings')
+        search.rebuild_index()
+        cache.bump_versions(*cache.CACHE_GROUPS)
+        CollectionVersion.bump(CollectionVersion.GLOBAL)
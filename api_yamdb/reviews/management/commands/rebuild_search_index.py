@@ -0,0 +1,13 @@
+from django.core.management import BaseCommand
+
+from reviews import search
+
+
+class Command(BaseCommand):
+    """Класс перестроения поискового индекса произведений."""
+
+    help = 'Rebuilds the title full-text search index'
+
+    def handle(self, *args, **options):
+        search.rebuild_index()
+        self.stdout.write(self.style.SUCCESS('Поисковый индекс перестроен.'))
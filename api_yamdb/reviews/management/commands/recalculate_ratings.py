@@ -0,0 +1,41 @@
+from django.core.management import BaseCommand
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from api import cache
+from reviews.models import CollectionVersion, Review, Title
+
+
+def recalculate_ratings():
+    """Пересчитывает сумму и количество оценок всех произведений."""
+    reviews = Review.objects.filter(
+        title=OuterRef('pk')
+    ).order_by().values('title')
+    with transaction.atomic():
+        cache.invalidate(cache.TITLES)
+        CollectionVersion.bump(CollectionVersion.TITLES)
+        return Title.objects.update(
+            rating_sum=Coalesce(
+                Subquery(reviews.annotate(total=Sum('score')).values('total')),
+                0
+            ),
+            rating_count=Coalesce(
+                Subquery(reviews.annotate(total=Count('id')).values('total')),
+                0
+            ),
+        )
+
+
+class Command(BaseCommand):
+    """Класс пересчета рейтингов произведений по отзывам."""
+
+    help = 'Recalculates stored title ratings from reviews'
+
+    def handle(self, *args, **options):
+        updated = recalculate_ratings()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Рейтинги пересчитаны: {updated} произведений.'
+            )
+        )
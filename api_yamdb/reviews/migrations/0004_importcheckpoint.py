@@ -0,0 +1,30 @@
+# Generated by Django 3.2 on 2026-10-18 19:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0003_title_rating'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file_path', models.CharField(max_length=512, unique=True, verbose_name='путь к файлу')),
+                ('file_size', models.PositiveBigIntegerField(default=0, verbose_name='размер файла')),
+                ('offset', models.PositiveBigIntegerField(default=0, verbose_name='загружено байт')),
+                ('rows', models.PositiveBigIntegerField(default=0, verbose_name='загружено строк')),
+                ('completed', models.BooleanField(default=False, verbose_name='загрузка завершена')),
+                ('updated', models.DateTimeField(auto_now=True, verbose_name='Дата обновления')),
+            ],
+            options={
+                'verbose_name': 'Контрольная точка импорта',
+                'verbose_name_plural': 'Контрольные точки импорта',
+                'ordering': ('file_path',),
+            },
+        ),
+    ]
@@ -1,7 +1,9 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.utils import timezone
 
-from api.constants import (MAX_LEN_NAME_GATEGORY, MAX_LEN_NAME_GENRE,
-                           MAX_LEN_NAME_TITLE, MAX_LEN_SLUG)
+from api.constants import (MAX_LEN_FILE_PATH, MAX_LEN_NAME_GATEGORY,
+                           MAX_LEN_NAME_GENRE, MAX_LEN_NAME_TITLE,
+                           MAX_LEN_SLUG, MAX_LEN_VERSION_KEY)
 from api.validators import year_validator
 from users.models import User
 
@@ -62,8 +64,7 @@ class Title(models.Model):
     )
     year = models.PositiveIntegerField(
         verbose_name='год выпуска',
-        validators=[year_validator],
-        db_index=True
+        validators=[year_validator]
     )
     description = models.TextField(
         verbose_name='описание',
@@ -83,15 +84,68 @@ class Title(models.Model):
         verbose_name='категория',
         null=True
     )
+    rating_sum = models.PositiveIntegerField(
+        verbose_name='сумма оценок',
+        default=0,
+        editable=False
+    )
+    rating_count = models.PositiveIntegerField(
+        verbose_name='количество оценок',
+        default=0,
+        editable=False
+    )
 
     class Meta:
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
         ordering = ('-year', 'name')
+        indexes = (
+            models.Index(
+                fields=('-year', 'name', 'id'),
+                name='title_year_name_idx'
+            ),
+            models.Index(
+                fields=('category', '-year', 'name', 'id'),
+                name='title_category_year_name_idx'
+            ),
+        )
 
     def __str__(self):
         return self.name
 
+    @staticmethod
+    def calculate_rating(rating_sum, rating_count):
+        """Средняя оценка, округленная вниз; без оценок - None."""
+        if not rating_count:
+            return None
+        return rating_sum // rating_count
+
+    @property
+    def rating(self):
+        """Средняя оценка произведения, округленная вниз."""
+        return self.calculate_rating(self.rating_sum, self.rating_count)
+
+    @classmethod
+    def change_rating(cls, title_id, score_delta, count_delta=0):
+        """
+        Атомарно изменяет сохраненные сумму и количество оценок.
+        Возвращает True, если изменилась средняя оценка.
+        """
+        titles = cls.objects.filter(pk=title_id)
+        updated = titles.update(
+            rating_sum=models.F('rating_sum') + score_delta,
+            rating_count=models.F('rating_count') + count_delta
+        )
+        if not updated:
+            return False
+        rating_sum, rating_count = titles.values_list(
+            'rating_sum', 'rating_count'
+        ).get()
+        return cls.calculate_rating(rating_sum, rating_count) != (
+            cls.calculate_rating(rating_sum - score_delta,
+                                 rating_count - count_delta)
+        )
+
 
 class GenreTitle(models.Model):
     """Вспомогательный класс, связывающий жанры и произведения."""
@@ -99,7 +153,8 @@ class GenreTitle(models.Model):
     genre = models.ForeignKey(
         Genre,
         on_delete=models.CASCADE,
-        verbose_name='Жанр'
+        verbose_name='Жанр',
+        db_index=False
     )
     title = models.ForeignKey(
         Title,
@@ -111,6 +166,12 @@ class GenreTitle(models.Model):
         verbose_name = 'Соответствие жанра и произведения'
         verbose_name_plural = 'Таблица соответствия жанров и произведений'
         ordering = ('id',)
+        constraints = (
+            models.UniqueConstraint(
+                fields=('genre', 'title'),
+                name='unique_genre_title'
+            ),
+        )
 
     def __str__(self):
         return f'{self.title} принадлежит жанру/ам {self.genre}'
@@ -152,10 +213,33 @@ class Review(models.Model):
                 name='unique_author_title'
             ),
         )
+        indexes = (
+            models.Index(
+                fields=('title', '-pub_date', '-id'),
+                name='review_title_pub_date_idx'
+            ),
+        )
 
     def __str__(self):
         return self.text
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Запоминает сохраненные в БД произведение и оценку: по ним
+        сигналы изменяют рейтинг произведения при сохранении отзыва.
+        """
+        instance = super().from_db(db, field_names, values)
+        instance.stored_rating = (
+            instance.__dict__.get('title_id'), instance.__dict__.get('score')
+        )
+        return instance
+
+    def save(self, *args, **kwargs):
+        """Сохраняет отзыв и изменяет рейтинг в одной транзакции."""
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+
 
 class Comment(models.Model):
     """Добавление нового комментария для отзыва."""
@@ -185,6 +269,120 @@ class Comment(models.Model):
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
         ordering = ('-pub_date',)
+        indexes = (
+            models.Index(
+                fields=('review', '-pub_date', '-id'),
+                name='comment_review_pub_date_idx'
+            ),
+        )
 
     def __str__(self):
         return self.text
+
+
+class ImportCheckpoint(models.Model):
+    """Позиция, до которой загружен csv-файл при импорте данных."""
+
+    file_path = models.CharField(
+        max_length=MAX_LEN_FILE_PATH,
+        verbose_name='путь к файлу',
+        unique=True
+    )
+    file_size = models.PositiveBigIntegerField(
+        verbose_name='размер файла',
+        default=0
+    )
+    offset = models.PositiveBigIntegerField(
+        verbose_name='загружено байт',
+        default=0
+    )
+    rows = models.PositiveBigIntegerField(
+        verbose_name='загружено строк',
+        default=0
+    )
+    completed = models.BooleanField(
+        verbose_name='загрузка завершена',
+        default=False
+    )
+    updated = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата обновления'
+    )
+
+    class Meta:
+        verbose_name = 'Контрольная точка импорта'
+        verbose_name_plural = 'Контрольные точки импорта'
+        ordering = ('file_path',)
+
+    def __str__(self):
+        return f'{self.file_path}: {self.rows}'
+
+
+class CollectionVersion(models.Model):
+    """
+    Счетчик изменений коллекции объектов API. Увеличивается в той же
+    транзакции, что и изменение данных, и служит для вычисления
+    ETag и Last-Modified без выборки самой коллекции.
+    """
+
+    GLOBAL = '*'
+    TITLES = 'titles'
+
+    key = models.CharField(
+        max_length=MAX_LEN_VERSION_KEY,
+        verbose_name='коллекция',
+        unique=True
+    )
+    version = models.PositiveBigIntegerField(
+        verbose_name='версия',
+        default=0
+    )
+    updated = models.DateTimeField(
+        verbose_name='Дата изменения',
+        default=timezone.now
+    )
+
+    class Meta:
+        verbose_name = 'Версия коллекции'
+        verbose_name_plural = 'Версии коллекций'
+        ordering = ('key',)
+
+    def __str__(self):
+        return f'{self.key}: {self.version}'
+
+    @staticmethod
+    def reviews_key(title_id):
+        return f'reviews:{title_id}'
+
+    @staticmethod
+    def comments_key(review_id):
+        return f'comments:{review_id}'
+
+    @classmethod
+    def seed(cls, using=None):
+        """
+        Создает строки общих коллекций, чтобы первые записи
+        не конкурировали за их создание.
+        """
+        cls.objects.using(using).bulk_create(
+            [cls(key=key) for key in (cls.GLOBAL, cls.TITLES)],
+            ignore_conflicts=True
+        )
+
+    @classmethod
+    def bump(cls, *keys):
+        """
+        Увеличивает версии коллекций, создавая недостающие. Если
+        строку одновременно создал другой запрос, она обновляется.
+        """
+        now = timezone.now()
+        for key in keys:
+            versions = cls.objects.filter(key=key)
+            changes = {'version': models.F('version') + 1, 'updated': now}
+            if versions.update(**changes):
+                continue
+            try:
+                with transaction.atomic():
+                    cls.objects.create(key=key, version=1, updated=now)
+            except IntegrityError:
+                versions.update(**changes)
@@ -0,0 +1,143 @@
+"""
+Полнотекстовый поиск произведений по названию и описанию.
+
+На SQLite индексом служит виртуальная таблица FTS5, которая
+синхронизируется сигналами при изменении произведений.
+На PostgreSQL используется GIN-индекс по выражению tsvector
+над полями модели, поэтому он обновляется самой БД.
+На остальных СУБД поиск выполняется без индекса через icontains.
+"""
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+FTS_TABLE = 'reviews_title_search'
+PG_INDEX = 'reviews_title_search_gin'
+PG_CONFIG = 'simple'
+# Совпадение в названии весит больше, чем совпадение в описании.
+NAME_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+MAX_TERMS = 16
+
+SQLITE_CREATE = (
+    f'CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} '
+    "USING fts5(name, description, tokenize='unicode61', prefix='2 3')"
+)
+SQLITE_DROP = f'DROP TABLE IF EXISTS {FTS_TABLE}'
+PG_VECTOR = (
+    "setweight(to_tsvector('{config}', coalesce({table}name, '')), 'A') || "
+    "setweight(to_tsvector('{config}', coalesce({table}description, '')),"
+    " 'B')"
+)
+PG_CREATE = (
+    f'CREATE INDEX IF NOT EXISTS {PG_INDEX} ON reviews_title '
+    f'USING GIN (({PG_VECTOR.format(config=PG_CONFIG, table="")}))'
+)
+PG_DROP = f'DROP INDEX IF EXISTS {PG_INDEX}'
+
+
+def get_terms(query):
+    """Разбивает поисковую строку на слова, отбрасывая операторы."""
+    return re.findall(r'\w+', query.lower())[:MAX_TERMS]
+
+
+def create_index(schema_editor):
+    """Создает поисковый индекс и заполняет его текущими данными."""
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(SQLITE_CREATE)
+        rebuild_index(schema_editor.connection)
+    elif vendor == 'postgresql':
+        schema_editor.execute(PG_CREATE)
+
+
+def drop_index(schema_editor):
+    """Удаляет поисковый индекс."""
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(SQLITE_DROP)
+    elif vendor == 'postgresql':
+        schema_editor.execute(PG_DROP)
+
+
+def rebuild_index(using=connection):
+    """
+    Перестраивает индекс SQLite по таблице произведений.
+    Нужен после загрузок в обход сигналов (bulk_create, update).
+    """
+    if using.vendor != 'sqlite':
+        return
+    if FTS_TABLE not in using.introspection.table_names():
+        return
+    with using.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, name, description) '
+            'SELECT id, name, description FROM reviews_title'
+        )
+
+
+def index_title(title):
+    """Добавляет или обновляет произведение в индексе SQLite."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+                       (title.pk,))
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, name, description) '
+            'VALUES (%s, %s, %s)',
+            (title.pk, title.name, title.description)
+        )
+
+
+def remove_title(title_id):
+    """Удаляет произведение из индекса SQLite."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+                       (title_id,))
+
+
+def search_titles(queryset, query):
+    """
+    Оставляет в queryset произведения, содержащие все слова запроса
+    (последнее слово ищется по префиксу), и сортирует их по релевантности.
+    """
+    terms = get_terms(query)
+    if not terms:
+        return queryset.none()
+    vendor = connection.vendor
+    if vendor == 'sqlite':
+        match = ' '.join(f'"{term}"' for term in terms) + '*'
+        return queryset.extra(
+            tables=(FTS_TABLE,),
+            where=(
+                f'{FTS_TABLE}.rowid = reviews_title.id',
+                f'{FTS_TABLE} MATCH %s',
+            ),
+            params=(match,),
+            select={'search_rank': (
+                f'bm25({FTS_TABLE}, {NAME_WEIGHT}, {DESCRIPTION_WEIGHT})'
+            )},
+            order_by=('search_rank', '-year', 'name'),
+        )
+    if vendor == 'postgresql':
+        tsquery = ' & '.join(terms) + ':*'
+        vector = PG_VECTOR.format(config=PG_CONFIG, table='reviews_title.')
+        return queryset.extra(
+            where=(f"({vector}) @@ to_tsquery('{PG_CONFIG}', %s)",),
+            params=(tsquery,),
+            select={'search_rank': (
+                f"ts_rank(({vector}), to_tsquery('{PG_CONFIG}', %s))"
+            )},
+            select_params=(tsquery,),
+            order_by=('-search_rank', '-year', 'name'),
+        )
+    for term in terms:
+        queryset = queryset.filter(
+            Q(name__icontains=term) | Q(description__icontains=term)
+        )
+    return queryset
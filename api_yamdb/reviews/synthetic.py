@@ -0,0 +1,144 @@
+"""
+Генератор синтетических данных для нагрузочных замеров.
+
+Данные повторяют структуру файлов static/data: категории, жанры,
+пользователи, произведения с жанрами, отзывы и комментарии.
+При одинаковом seed генерируется один и тот же набор данных.
+"""
+import random
+from itertools import islice
+
+from django.db import transaction
+
+from api import cache
+from reviews import search
+from reviews.management.commands.importcsv import reset_sequences
+from reviews.management.commands.recalculate_ratings import \
+    recalculate_ratings
+from reviews.models import (Category, CollectionVersion, Comment, Genre,
+                            GenreTitle, Review, Title)
+from users.models import User
+
+BATCH_SIZE = 1000
+WORDS = (
+    'побег', 'крестный', 'отец', 'зеленая', 'миля', 'криминальное', 'чтиво',
+    'властелин', 'колец', 'терминатор', 'орешек', 'клуб', 'звездные',
+    'войны', 'матрица', 'начало', 'интерстеллар', 'солярис', 'сталкер',
+    'мастер', 'маргарита', 'война', 'мир', 'преступление', 'наказание',
+    'ночь', 'день', 'город', 'море', 'небо', 'дорога', 'дом', 'друг',
+    'любовь', 'время', 'история', 'тайна', 'последний', 'первый', 'новый',
+)
+MIN_YEAR = 1900
+MAX_YEAR = 2023
+
+
+def batched(objects, size=BATCH_SIZE):
+    objects = iter(objects)
+    while True:
+        batch = list(islice(objects, size))
+        if not batch:
+            return
+        yield batch
+
+
+def bulk_insert(model, objects):
+    """Сохраняет объекты пачками в одной транзакции."""
+    with transaction.atomic():
+        for batch in batched(objects):
+            model.objects.bulk_create(batch)
+
+
+def sentence(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def title_objects(rng, titles, categories):
+    for idx in range(1, titles + 1):
+        category_id = rng.randint(1, max(categories, 1))
+        yield Title(id=idx, name=sentence(rng, rng.randint(1, 3)),
+                    year=rng.randint(MIN_YEAR, MAX_YEAR),
+                    description=sentence(rng, rng.randint(5, 15)),
+                    category_id=category_id if categories else None)
+
+
+def genre_title_objects(rng, titles, genres, max_genres_per_title):
+    for title_id in range(1, titles + 1):
+        for genre_id in rng.sample(
+            range(1, genres + 1), rng.randint(1, max_genres_per_title)
+        ):
+            yield GenreTitle(genre_id=genre_id, title_id=title_id)
+
+
+def review_objects(rng, titles, users, reviews_per_title):
+    review_id = 0
+    for title_id in range(1, titles + 1):
+        for author_id in rng.sample(range(1, users + 1), reviews_per_title):
+            review_id += 1
+            yield Review(id=review_id, title_id=title_id,
+                         author_id=author_id, score=rng.randint(1, 10),
+                         text=sentence(rng, rng.randint(5, 30)))
+
+
+def comment_objects(rng, reviews, users, comments_per_review):
+    for review_id in range(1, reviews + 1):
+        for _ in range(comments_per_review):
+            yield Comment(review_id=review_id,
+                          author_id=rng.randint(1, users),
+                          text=sentence(rng, rng.randint(3, 20)))
+
+
+def generate_dataset(titles=1000, genres=20, categories=5, users=200,
+                     reviews_per_title=5, comments_per_review=2,
+                     max_genres_per_title=3, seed=0):
+    """
+    Заполняет пустую БД синтетическими данными и возвращает
+    количество созданных объектов каждого вида.
+    Идентификаторы назначаются явно, начиная с 1. Каждая таблица
+    генерируется своим потоком случайных чисел, поэтому, например,
+    произведения не зависят от числа отзывов.
+    """
+    def get_rng(table):
+        return random.Random(f'{seed}:{table}')
+
+    reviews_per_title = min(reviews_per_title, users)
+    reviews = titles * reviews_per_title
+
+    bulk_insert(Category, (
+        Category(id=idx, name=f'Категория {idx}', slug=f'category-{idx}')
+        for idx in range(1, categories + 1)
+    ))
+    bulk_insert(Genre, (
+        Genre(id=idx, name=f'Жанр {idx}', slug=f'genre-{idx}')
+        for idx in range(1, genres + 1)
+    ))
+    bulk_insert(User, (
+        User(id=idx, username=f'user{idx}', email=f'user{idx}@yamdb.fake',
+             role=User.USER)
+        for idx in range(1, users + 1)
+    ))
+    bulk_insert(Title, title_objects(get_rng('titles'), titles, categories))
+    bulk_insert(GenreTitle, genre_title_objects(
+        get_rng('genre_title'), titles, genres,
+        min(max_genres_per_title, genres)
+    ) if genres else ())
+    bulk_insert(Review, review_objects(
+        get_rng('reviews'), titles, users, reviews_per_title
+    ))
+    bulk_insert(Comment, comment_objects(
+        get_rng('comments'), reviews, users, comments_per_review
+    ) if users else ())
+
+    for model in (Category, Genre, User, Title, Review):
+        reset_sequences(model)
+    recalculate_ratings()
+    search.rebuild_index()
+    cache.bump_versions(*cache.CACHE_GROUPS)
+    CollectionVersion.bump(CollectionVersion.GLOBAL)
+    return {
+        'categories': categories,
+        'genres': genres,
+        'users': users,
+        'titles': titles,
+        'reviews': reviews,
+        'comments': reviews * comments_per_review,
+    }
@@ -0,0 +1,96 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection, send_mail
+from django.db import transaction
+from django.utils import timezone
+
+from .models import QueuedEmail
+
+EMAIL_DELIVERY_EAGER = 'eager'
+EMAIL_DELIVERY_QUEUE = 'queue'
+
+
+def queue_mail(subject, message, from_email, recipient_list):
+    """
+    Ставит письмо в очередь на отправку.
+    В режиме EMAIL_DELIVERY = 'eager' письмо отправляется сразу.
+    """
+    if settings.EMAIL_DELIVERY == EMAIL_DELIVERY_EAGER:
+        return send_mail(subject, message, from_email, recipient_list,
+                         fail_silently=False)
+    QueuedEmail.objects.bulk_create(
+        QueuedEmail(subject=subject, body=message, from_email=from_email,
+                    recipient=recipient)
+        for recipient in recipient_list
+    )
+    return len(recipient_list)
+
+
+def claim_queued_mail(batch_size):
+    """
+    Забирает из очереди пачку писем, готовых к отправке, и откладывает
+    их на EMAIL_QUEUE_CLAIM_TIMEOUT, чтобы их не взял другой обработчик.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        emails = list(
+            QueuedEmail.objects.select_for_update(skip_locked=True).filter(
+                sent__isnull=True,
+                send_after__lte=now,
+                attempts__lt=settings.EMAIL_QUEUE_MAX_ATTEMPTS,
+            )[:batch_size]
+        )
+        QueuedEmail.objects.filter(
+            pk__in=[email.pk for email in emails]
+        ).update(send_after=now + timedelta(
+            seconds=settings.EMAIL_QUEUE_CLAIM_TIMEOUT
+        ))
+    return emails
+
+
+def postpone(email, error):
+    """Откладывает письмо с экспоненциально растущей задержкой."""
+    email.attempts += 1
+    email.last_error = str(error)
+    email.send_after = timezone.now() + timedelta(
+        seconds=settings.EMAIL_QUEUE_RETRY_DELAY * 2 ** (email.attempts - 1)
+    )
+
+
+def send_queued_mail(batch_size=None):
+    """
+    Отправляет пачку писем из очереди через одно соединение
+    с почтовым сервером; неотправленные письма откладываются.
+    Возвращает количество отправленных и неотправленных писем.
+    """
+    emails = claim_queued_mail(
+        batch_size or settings.EMAIL_QUEUE_BATCH_SIZE
+    )
+    if not emails:
+        return 0, 0
+    sent = 0
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as error:
+        for email in emails:
+            postpone(email, error)
+    else:
+        for email in emails:
+            try:
+                connection.send_messages([EmailMessage(
+                    email.subject, email.body, email.from_email,
+                    (email.recipient,), connection=connection
+                )])
+            except Exception as error:
+                postpone(email, error)
+            else:
+                email.attempts += 1
+                email.sent = timezone.now()
+                sent += 1
+        connection.close()
+    QueuedEmail.objects.bulk_update(
+        emails, ('attempts', 'last_error', 'send_after', 'sent')
+    )
+    return sent, len(emails) - sent
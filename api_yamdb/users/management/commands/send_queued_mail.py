@@ -0,0 +1,40 @@
+from time import sleep
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from users.mail import send_queued_mail
+
+
+class Command(BaseCommand):
+    help = 'Sends emails from the outgoing mail queue'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int,
+            default=settings.EMAIL_QUEUE_BATCH_SIZE,
+            help='Number of emails sent over one connection'
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep polling the queue instead of draining it once'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=1.0,
+            help='Seconds to wait when the queue is empty in --loop mode'
+        )
+
+    def handle(self, *args, **options):
+        total_sent = total_failed = 0
+        while True:
+            sent, failed = send_queued_mail(options['batch_size'])
+            total_sent += sent
+            total_failed += failed
+            if sent or failed:
+                continue
+            if not options['loop']:
+                break
+            sleep(options['interval'])
+        self.stdout.write(self.style.SUCCESS(
+            f'{total_sent} emails sent, {total_failed} postponed.'
+        ))
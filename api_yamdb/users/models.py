@@ -1,8 +1,10 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
 from django.utils.crypto import get_random_string
 
-from api.constants import LEN_CODE_USER, MAX_LEN_CODE_USER, MAX_LEN_ROLE_USER
+from api.constants import (LEN_CODE_USER, MAX_LEN_CODE_USER, MAX_LEN_EMAIL,
+                           MAX_LEN_EMAIL_SUBJECT, MAX_LEN_ROLE_USER)
 
 
 class User(AbstractUser):
@@ -28,6 +30,13 @@ class User(AbstractUser):
     class Meta:
         ordering = ('id',)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Запоминает сохраненный username, чтобы заметить его смену."""
+        instance = super().from_db(db, field_names, values)
+        instance.stored_username = instance.__dict__.get('username')
+        return instance
+
     def generate_confirmation_code(self):
         self.confirmation_code = get_random_string(length=LEN_CODE_USER)
         self.save()
@@ -51,3 +60,32 @@ class User(AbstractUser):
     @property
     def is_super_user(self):
         return self.is_superuser
+
+
+class QueuedEmail(models.Model):
+    """Письмо в очереди на отправку."""
+
+    subject = models.CharField('Тема', max_length=MAX_LEN_EMAIL_SUBJECT)
+    body = models.TextField('Текст')
+    from_email = models.CharField('Отправитель', max_length=MAX_LEN_EMAIL)
+    recipient = models.EmailField('Получатель', max_length=MAX_LEN_EMAIL)
+    attempts = models.PositiveSmallIntegerField('Попыток отправки', default=0)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    created = models.DateTimeField('Дата создания', auto_now_add=True)
+    send_after = models.DateTimeField(
+        'Отправить не раньше', default=timezone.now
+    )
+    sent = models.DateTimeField('Дата отправки', null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Письмо в очереди'
+        verbose_name_plural = 'Очередь писем'
+        ordering = ('send_after', 'id')
+        indexes = (
+            models.Index(
+                fields=('sent', 'send_after'), name='queued_email_pending'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.recipient}: {self.subject}'
@@ -0,0 +1,102 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Review, Title
+from tests.utils import (create_reviews, create_single_review,
+                         create_titles)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+
+    def get_rating(self, client, title_id):
+        response = client.get(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id)
+        )
+        assert response.status_code == HTTPStatus.OK
+        return response.json()['rating']
+
+    def test_01_rating_follows_review_changes(self, client, admin_client,
+                                              admin, user_client, user):
+        reviews, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        title_id = titles[0]['id']
+        assert self.get_rating(client, title_id) == 5, (
+            'Рейтинг произведения должен обновляться при создании отзыва.'
+        )
+
+        response = user_client.patch(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=reviews[1]['id']
+            ),
+            data={'score': 8}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert self.get_rating(client, title_id) == 6, (
+            'Рейтинг произведения должен обновляться при изменении оценки.'
+        )
+
+        response = admin_client.delete(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=reviews[0]['id']
+            )
+        )
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert self.get_rating(client, title_id) == 8, (
+            'Рейтинг произведения должен обновляться при удалении отзыва.'
+        )
+        assert self.get_rating(client, titles[1]['id']) is None
+
+    def test_02_recalculate_ratings_command(self, client, admin_client,
+                                            user_client):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'text', 3)
+        create_single_review(admin_client, titles[0]['id'], 'text', 10)
+        Title.objects.update(rating_sum=0, rating_count=0)
+
+        call_command('recalculate_ratings')
+
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.rating_sum, title.rating_count) == (13, 2)
+        assert self.get_rating(client, titles[0]['id']) == 6
+
+    def test_03_rating_follows_cascade_delete(self, client, admin_client,
+                                              user_client, user):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(user_client, title_id, 'text', 10)
+        create_single_review(admin_client, title_id, 'text', 2)
+        assert self.get_rating(client, title_id) == 6
+
+        response = admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert self.get_rating(client, title_id) == 2, (
+            'Рейтинг произведения должен обновляться при удалении отзывов '
+            'вместе с автором.'
+        )
+        title = Title.objects.get(pk=title_id)
+        assert (title.rating_sum, title.rating_count) == (2, 1)
+
+    def test_04_rating_follows_orm_changes(self, client, admin_client, user):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        review = Review.objects.create(author=user, title_id=title_id,
+                                       text='text', score=4)
+        assert self.get_rating(client, title_id) == 4
+        review = Review.objects.get(pk=review.pk)
+        review.score = 9
+        review.save()
+        review.save()
+        assert self.get_rating(client, title_id) == 9
+        Title.objects.get(pk=title_id).delete()
+        Review.objects.create(author=user, title_id=titles[1]['id'],
+                              text='text', score=7)
+        assert self.get_rating(client, titles[1]['id']) == 7
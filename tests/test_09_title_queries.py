@@ -0,0 +1,69 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.serializers import TitleGetSerializer
+from api.views import TitlesViewSet
+from reviews.models import Category, Genre, Title
+
+
+def create_titles(count):
+    genres = [
+        Genre.objects.get_or_create(name=f'genre {idx}', slug=f'genre-{idx}')[0]
+        for idx in range(3)
+    ]
+    categories = [
+        Category.objects.get_or_create(
+            name=f'category {idx}', slug=f'category-{idx}'
+        )[0]
+        for idx in range(3)
+    ]
+    start = Title.objects.count()
+    for idx in range(start, start + count):
+        title = Title.objects.create(
+            name=f'title {idx}', year=2000, category=categories[idx % 3]
+        )
+        title.genre.set(genres[:idx % 3 + 1])
+
+
+def count_queries(func):
+    with CaptureQueriesContext(connection) as context:
+        func()
+    return len(context.captured_queries)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09TitleQueries:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_list_query_count_is_flat(self, client):
+        create_titles(1)
+        small_page = count_queries(lambda: client.get(self.TITLES_URL))
+        create_titles(9)
+        full_page = count_queries(lambda: client.get(self.TITLES_URL))
+        assert small_page == full_page, (
+            f'Проверьте, что GET-запрос к `{self.TITLES_URL}` выполняет '
+            'одинаковое количество запросов к БД независимо от размера '
+            'страницы.'
+        )
+
+    def test_02_serializer_query_count_for_100_titles(self):
+        create_titles(100)
+        queryset = TitlesViewSet.queryset.all()[:100]
+        queries = count_queries(
+            lambda: TitleGetSerializer(queryset, many=True).data
+        )
+        assert queries == 2, (
+            'Жанры и категории 100 произведений должны загружаться '
+            'фиксированным количеством запросов.'
+        )
+
+    def test_03_detail_query_count(self, client):
+        create_titles(3)
+        title = Title.objects.first()
+        queries = count_queries(
+            lambda: client.get(f'{self.TITLES_URL}{title.id}/')
+        )
+        # Версия коллекции для ETag, произведение с категорией, жанры.
+        assert queries == 3
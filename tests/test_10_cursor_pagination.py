@@ -0,0 +1,106 @@
+import json
+from base64 import b64encode
+from http import HTTPStatus
+from urllib.parse import urlencode
+
+import pytest
+from django.utils import timezone
+
+from reviews.models import Comment, Review, Title
+
+
+def cursor(position):
+    """Кодирует позицию в курсор так же, как CursorPagination."""
+    query = urlencode({'p': json.dumps(position)})
+    return b64encode(query.encode('ascii')).decode('ascii')
+
+
+def collect_pages(client, url):
+    pages = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert 'count' not in data, (
+            'В курсорном режиме пагинации ответ не должен содержать `count`.'
+        )
+        pages.append(data)
+        url = data['next']
+    return pages
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10CursorPagination:
+
+    TITLES_URL = '/api/v1/titles/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    def test_01_titles_cursor_walks_all_pages(self, client):
+        for idx in range(25):
+            Title.objects.create(name=f'title {idx % 4}', year=2000 + idx % 2)
+        expected = list(
+            Title.objects.order_by('-year', 'name', 'id')
+            .values_list('id', flat=True)
+        )
+
+        pages = collect_pages(client, f'{self.TITLES_URL}?pagination=cursor')
+        ids = [title['id'] for page in pages for title in page['results']]
+        assert ids == expected, (
+            'Проверьте, что курсорная пагинация произведений возвращает '
+            'все объекты ровно один раз в порядке `-year, name`.'
+        )
+        assert len(pages) == 3
+        assert pages[0]['previous'] is None
+
+        response = client.get(pages[-1]['previous'])
+        assert response.json()['results'] == pages[-2]['results']
+        response = client.get(pages[1]['previous'])
+        assert response.json()['results'] == pages[0]['results']
+
+    def test_02_reviews_and_comments_cursor(self, client, user, admin):
+        title = Title.objects.create(name='title', year=2000)
+        pub_date = timezone.now()
+        review = Review.objects.create(
+            author=user, title=title, text='text', score=5
+        )
+        for idx in range(12):
+            Comment.objects.create(author=admin, review=review, text=str(idx))
+        Comment.objects.update(pub_date=pub_date)
+        Review.objects.create(author=admin, title=title, text='text', score=5)
+
+        url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=title.id, review_id=review.id
+        )
+        pages = collect_pages(client, f'{url}?pagination=cursor')
+        ids = [comment['id'] for page in pages for comment in page['results']]
+        assert ids == sorted(ids, reverse=True)
+        assert len(ids) == 12
+
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+        pages = collect_pages(client, f'{url}?pagination=cursor')
+        assert len(pages[0]['results']) == 2
+
+    def test_03_invalid_cursor(self, client):
+        response = client.get(f'{self.TITLES_URL}?cursor=broken')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    @pytest.mark.parametrize('position', (
+        [{'a': 1}, 'x', 1], [[1], 'x', 1], [None, 'x', 1], ['abc', 'x', 1],
+        [2000, 'x'], {'year': 2000},
+    ))
+    def test_04_crafted_title_cursor(self, client, position):
+        Title.objects.create(name='title', year=2000)
+        response = client.get(self.TITLES_URL, {'cursor': cursor(position)})
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    @pytest.mark.parametrize('position', (
+        [1, 1], [{'a': 1}, 1], ['2020-01-01T00:00:00', 'x'], [None, 1],
+    ))
+    def test_05_crafted_review_cursor(self, client, position):
+        title = Title.objects.create(name='title', year=2000)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+        response = client.get(url, {'cursor': cursor(position)})
+        assert response.status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,178 @@
+import csv
+
+import pytest
+from django.core.management import call_command
+
+from reviews.management.commands import importcsv
+
+from reviews.models import (Category, Comment, GenreTitle, ImportCheckpoint,
+                            Review, Title, User)
+
+
+def write_csv(directory, name, rows):
+    with open(directory / f'{name}.csv', 'w', encoding='utf-8',
+              newline='') as file:
+        csv.writer(file).writerows(rows)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11ImportCSV:
+
+    def test_01_import_bundled_data(self):
+        call_command('importcsv')
+        assert Category.objects.count() == 3
+        assert Title.objects.count() == 32
+        assert GenreTitle.objects.count() == 42
+        assert Review.objects.count() == 72
+        assert Comment.objects.count() == 3
+        title = Title.objects.get(pk=1)
+        assert title.rating_count == title.reviews.count(), (
+            'После импорта рейтинги произведений должны быть пересчитаны.'
+        )
+
+    def test_02_rows_with_unknown_foreign_keys_are_skipped(self, settings,
+                                                           tmp_path):
+        write_csv(tmp_path, 'category', [
+            ('id', 'name', 'slug'), (1, 'Фильм', 'movie')
+        ])
+        write_csv(tmp_path, 'titles', [
+            ('id', 'name', 'year', 'category'),
+            (1, 'first', 1994, 1),
+            (2, 'second', 1995, 42),
+            (3, 'third', 1996, ''),
+        ])
+        settings.CSV_FILES_DIR = str(tmp_path)
+        call_command('importcsv')
+        assert list(
+            Title.objects.order_by('pk').values_list('pk', 'category_id')
+        ) == [(1, 1), (3, None)]
+
+    def test_03_streamed_batches_without_preloaded_ids(self, monkeypatch):
+        monkeypatch.setattr(importcsv, 'BATCH_SIZE', 7)
+        monkeypatch.setattr(importcsv, 'PRELOAD_IDS_LIMIT', 0)
+        call_command('importcsv')
+        assert Title.objects.count() == 32
+        assert GenreTitle.objects.count() == 42
+        assert Review.objects.count() == 72
+        assert Comment.objects.count() == 3
+
+    def test_04_dependency_graph(self):
+        assert importcsv.get_dependencies(importcsv.FILES_CLASSES) == {
+            'category': set(),
+            'genre': set(),
+            'users': set(),
+            'titles': {'category'},
+            'genre_title': {'titles', 'genre'},
+            'review': {'titles', 'users'},
+            'comments': {'review', 'users'},
+        }
+
+    def test_05_parallel_loading_respects_dependencies(self, monkeypatch):
+        loaded = []
+
+        def fake_load_table(file_name, class_name, known_ids, **options):
+            dependencies = importcsv.get_dependencies(
+                importcsv.FILES_CLASSES
+            )[file_name]
+            assert dependencies <= set(loaded), (
+                f'Таблица {file_name} загружается раньше зависимостей.'
+            )
+            loaded.append(file_name)
+
+        monkeypatch.setattr(importcsv, 'load_table', fake_load_table)
+        importcsv.load_tables(importcsv.FILES_CLASSES, 3)
+        assert sorted(loaded) == sorted(importcsv.FILES_CLASSES)
+
+    def test_06_workers_fall_back_on_sqlite(self):
+        call_command('importcsv', workers=4)
+        assert Review.objects.count() == 72
+
+    def test_07_resume_after_failure(self, settings, tmp_path, monkeypatch,
+                                     capsys):
+        monkeypatch.setattr(importcsv, 'BATCH_SIZE', 10)
+        settings.CSV_FILES_DIR = str(tmp_path)
+        rows = [('id', 'name', 'year', 'category')]
+        rows += [(idx, f'title {idx}', 2000, '') for idx in range(1, 31)]
+        rows[25] = (5, 'duplicate', 2000, '')
+        write_csv(tmp_path, 'titles', rows)
+
+        call_command('importcsv')
+        assert 'не загружена' in capsys.readouterr().out
+        assert Title.objects.count() == 20
+        checkpoint = ImportCheckpoint.objects.get(
+            file_path=str(tmp_path / 'titles.csv')
+        )
+        assert (checkpoint.rows, checkpoint.completed) == (20, False)
+
+        rows[25] = (25, 'title 25', 2000, '')
+        write_csv(tmp_path, 'titles', rows)
+        call_command('importcsv', resume=True)
+        assert Title.objects.count() == 30
+        checkpoint.refresh_from_db()
+        assert (checkpoint.rows, checkpoint.completed) == (30, True)
+
+        Title.objects.filter(pk=1).delete()
+        call_command('importcsv', resume=True)
+        assert Title.objects.count() == 29, (
+            'Полностью загруженный файл не должен загружаться повторно '
+            'при продолжении импорта.'
+        )
+
+
+    def test_08_upsert_existing_rows(self, settings, tmp_path):
+        settings.CSV_FILES_DIR = str(tmp_path)
+        write_csv(tmp_path, 'titles', [
+            ('id', 'name', 'year', 'category'), (1, 'old', 2000, '')
+        ])
+        call_command('importcsv')
+        write_csv(tmp_path, 'titles', [
+            ('id', 'name', 'year', 'category'),
+            (1, 'new', 2001, ''),
+            (2, 'second', 2002, ''),
+        ])
+        call_command('importcsv', on_conflict='skip')
+        assert list(Title.objects.order_by('pk').values_list('pk', 'name')) == [
+            (1, 'old'), (2, 'second')
+        ]
+        call_command('importcsv', on_conflict='update')
+        assert Title.objects.get(pk=1).name == 'new'
+        assert Title.objects.get(pk=1).year == 2001
+
+    def test_09_import_users(self, tmp_path):
+        rows = [('id', 'username', 'email', 'role', 'bio', 'first_name',
+                 'last_name'),
+                (100, 'bingobongo', 'bingobongo@yamdb.fake', 'user', '', '',
+                 '')]
+        write_csv(tmp_path, 'users', rows)
+        csv_file = str(tmp_path / 'users.csv')
+        call_command('import_users', csv_file)
+        call_command('import_users', csv_file)
+        assert User.objects.filter(pk=100).count() == 1
+        rows[1] = rows[1][:4] + ('new bio', '', '')
+        write_csv(tmp_path, 'users', rows)
+        call_command('import_users', csv_file, on_conflict='update')
+        assert User.objects.get(pk=100).bio == 'new bio'
+
+    def test_10_resume_appended_rows(self, settings, tmp_path, capsys):
+        settings.CSV_FILES_DIR = str(tmp_path)
+        rows = [('id', 'name', 'year', 'category')]
+        rows += [(idx, f'title {idx}', 2000, '') for idx in range(1, 6)]
+        write_csv(tmp_path, 'titles', rows)
+        call_command('importcsv', resume=True)
+        assert Title.objects.count() == 5
+
+        with open(tmp_path / 'titles.csv', 'a', encoding='utf-8',
+                  newline='') as file:
+            csv.writer(file).writerows(
+                (idx, f'title {idx}', 2000, '') for idx in range(6, 9)
+            )
+        call_command('importcsv', resume=True)
+        assert 'Таблица Title не загружена' not in capsys.readouterr().out, (
+            'Строки, дописанные в загруженный файл, должны загружаться '
+            'с сохраненного смещения без повтора загруженных строк.'
+        )
+        assert Title.objects.count() == 8
+        checkpoint = ImportCheckpoint.objects.get(
+            file_path=str(tmp_path / 'titles.csv')
+        )
+        assert (checkpoint.rows, checkpoint.completed) == (8, True)
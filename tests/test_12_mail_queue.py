@@ -0,0 +1,71 @@
+from http import HTTPStatus
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.utils import timezone
+
+from users.models import QueuedEmail
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12MailQueue:
+
+    SIGNUP_URL = '/api/v1/auth/signup/'
+
+    @pytest.fixture(autouse=True)
+    def queue_delivery(self, settings):
+        settings.EMAIL_DELIVERY = 'queue'
+
+    def signup(self, client):
+        response = client.post(self.SIGNUP_URL, data={
+            'email': 'valid@yamdb.fake', 'username': 'valid_username'
+        })
+        assert response.status_code == HTTPStatus.OK
+        return response
+
+    def test_01_signup_enqueues_mail(self, client):
+        outbox_before_count = len(mail.outbox)
+        self.signup(client)
+        assert len(mail.outbox) == outbox_before_count, (
+            'В режиме очереди письмо не должно отправляться во время '
+            'запроса.'
+        )
+        assert QueuedEmail.objects.filter(
+            recipient='valid@yamdb.fake', sent__isnull=True
+        ).exists()
+
+        call_command('send_queued_mail')
+        assert len(mail.outbox) == outbox_before_count + 1
+        assert mail.outbox[-1].to == ['valid@yamdb.fake']
+        assert not QueuedEmail.objects.filter(sent__isnull=True).exists()
+
+    def test_02_failed_mail_is_retried(self, client, monkeypatch):
+        def broken_send(self, messages):
+            raise ConnectionError('smtp is down')
+
+        self.signup(client)
+        monkeypatch.setattr(EmailBackend, 'send_messages', broken_send)
+        call_command('send_queued_mail')
+        email = QueuedEmail.objects.get()
+        assert email.sent is None
+        assert email.attempts == 1
+        assert email.last_error == 'smtp is down'
+        assert email.send_after > timezone.now()
+
+        monkeypatch.undo()
+        QueuedEmail.objects.update(send_after=timezone.now())
+        call_command('send_queued_mail')
+        email.refresh_from_db()
+        assert email.sent is not None
+        assert email.attempts == 2
+
+    def test_03_mail_is_dropped_after_max_attempts(self, client, settings):
+        self.signup(client)
+        QueuedEmail.objects.update(
+            attempts=settings.EMAIL_QUEUE_MAX_ATTEMPTS
+        )
+        outbox_before_count = len(mail.outbox)
+        call_command('send_queued_mail')
+        assert len(mail.outbox) == outbox_before_count
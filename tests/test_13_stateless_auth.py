@@ -0,0 +1,120 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.authentication import (RoleRefreshToken, StatelessJWTAuthentication,
+                                StatelessUser)
+from api.permissions import IsSuperUserOrIsAdminOnly
+from api.views import (CommentViewSet, ReviewViewSet, TitlesViewSet,
+                       UserViewSet)
+from reviews.models import Title
+
+
+def stateless_client(user):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=(
+        f'Bearer {RoleRefreshToken.for_user(user).access_token}'
+    ))
+    return client
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13StatelessAuth:
+
+    @pytest.fixture(autouse=True)
+    def stateless_views(self, monkeypatch):
+        for view in (TitlesViewSet, ReviewViewSet, CommentViewSet,
+                     UserViewSet):
+            monkeypatch.setattr(
+                view, 'authentication_classes', (StatelessJWTAuthentication,)
+            )
+
+    def authenticate(self, user):
+        token = RoleRefreshToken.for_user(user).access_token
+        request = Request(
+            APIRequestFactory().get(
+                '/', HTTP_AUTHORIZATION=f'Bearer {token}'
+            ),
+            authenticators=(StatelessJWTAuthentication(),)
+        )
+        with CaptureQueriesContext(connection) as context:
+            request.user
+        return request, len(context.captured_queries)
+
+    def test_01_token_contains_role_claims(self, client, admin):
+        admin.generate_confirmation_code()
+        response = client.post('/api/v1/auth/token/', data={
+            'username': admin.username,
+            'confirmation_code': admin.confirmation_code
+        })
+        assert response.status_code == HTTPStatus.OK
+        token = AccessToken(response.json()['access'])
+        assert token['role'] == 'admin'
+        assert token['is_superuser'] is False
+        assert token['username'] == admin.username
+
+    def test_02_permissions_without_user_query(self, admin, user,
+                                               user_superuser):
+        permission = IsSuperUserOrIsAdminOnly()
+        for account, allowed in ((admin, True), (user_superuser, True),
+                                 (user, False)):
+            request, queries = self.authenticate(account)
+            assert isinstance(request.user, StatelessUser)
+            assert queries == 0, (
+                'Stateless-аутентификация не должна обращаться к БД.'
+            )
+            assert permission.has_permission(request, None) is allowed
+
+    def test_03_legacy_token_falls_back_to_database(self, user):
+        request = Request(
+            APIRequestFactory().get(
+                '/',
+                HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}'
+            ),
+            authenticators=(StatelessJWTAuthentication(),)
+        )
+        assert request.user == user
+        assert not isinstance(request.user, StatelessUser)
+
+    def test_04_views_with_stateless_user(self, admin, user):
+        admin_client = stateless_client(admin)
+        user_client = stateless_client(user)
+        title = Title.objects.create(name='title', year=2000)
+        url = f'/api/v1/titles/{title.id}/reviews/'
+
+        response = user_client.post(url, data={'text': 'text', 'score': 5})
+        assert response.status_code == HTTPStatus.CREATED
+        assert response.json()['author'] == user.username
+        review_url = f'{url}{response.json()["id"]}/'
+
+        response = user_client.patch(review_url, data={'text': 'edited'})
+        assert response.status_code == HTTPStatus.OK
+        response = admin_client.post(
+            f'{review_url}comments/', data={'text': 'comment'}
+        )
+        assert response.status_code == HTTPStatus.CREATED
+
+        response = user_client.delete(f'/api/v1/titles/{title.id}/')
+        assert response.status_code == HTTPStatus.FORBIDDEN
+        response = admin_client.delete(f'/api/v1/titles/{title.id}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+
+    def test_05_deleted_or_inactive_user(self, user, admin):
+        user_client = stateless_client(user)
+        admin_client = stateless_client(admin)
+        title = Title.objects.create(name='title', year=2000)
+        admin.is_active = False
+        admin.save()
+        user.delete()
+
+        for client in (user_client, admin_client):
+            response = client.post(f'/api/v1/titles/{title.id}/reviews/',
+                                   data={'text': 'text', 'score': 5})
+            assert response.status_code == HTTPStatus.UNAUTHORIZED
+            response = client.get('/api/v1/users/me/')
+            assert response.status_code == HTTPStatus.UNAUTHORIZED
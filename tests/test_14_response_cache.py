@@ -0,0 +1,73 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache as django_cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api import cache
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14ResponseCache:
+
+    TITLES_URL = '/api/v1/titles/'
+    GENRES_URL = '/api/v1/genres/'
+    CATEGORIES_URL = '/api/v1/categories/'
+
+    @pytest.fixture(autouse=True)
+    def enable_cache(self, settings):
+        settings.API_RESPONSE_CACHE_ENABLED = True
+        django_cache.clear()
+
+    def test_01_anonymous_reads_are_cached(self, client, admin_client):
+        create_titles(admin_client)
+        response = client.get(self.TITLES_URL)
+        assert response['X-Cache'] == 'MISS'
+        with CaptureQueriesContext(connection) as context:
+            cached = client.get(self.TITLES_URL)
+        assert cached['X-Cache'] == 'HIT'
+        assert cached.json() == response.json()
+        assert not context.captured_queries, (
+            'Ответ из кеша не должен обращаться к БД.'
+        )
+
+        filtered = client.get(f'{self.TITLES_URL}?year=1984')
+        assert filtered['X-Cache'] == 'MISS'
+        assert filtered.json()['count'] == 1
+
+        response = admin_client.get(self.TITLES_URL)
+        assert 'X-Cache' not in response
+        assert cache.get_stats() == {'hits': 1, 'misses': 2}
+
+    def test_02_writes_invalidate_dependent_responses(self, client,
+                                                      admin_client,
+                                                      user_client):
+        titles, _, genres = create_titles(admin_client)
+        title_url = f'{self.TITLES_URL}{titles[0]["id"]}/'
+        for url in (title_url, self.GENRES_URL, self.CATEGORIES_URL):
+            client.get(url)
+
+        create_single_review(user_client, titles[0]['id'], 'text', 7)
+        response = client.get(title_url)
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['rating'] == 7
+        assert client.get(self.GENRES_URL)['X-Cache'] == 'HIT'
+        assert client.get(self.CATEGORIES_URL)['X-Cache'] == 'HIT'
+
+        response = admin_client.delete(
+            f'{self.GENRES_URL}{genres[0]["slug"]}/'
+        )
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        response = client.get(self.GENRES_URL)
+        assert response['X-Cache'] == 'MISS'
+        assert genres[0] not in response.json()['results']
+        response = client.get(title_url)
+        assert response['X-Cache'] == 'MISS'
+        assert genres[0] not in response.json()['genre']
+        assert client.get(self.CATEGORIES_URL)['X-Cache'] == 'HIT'
+
+        response = admin_client.patch(title_url, data={'name': 'renamed'})
+        assert response.status_code == HTTPStatus.OK
+        assert client.get(title_url).json()['name'] == 'renamed'
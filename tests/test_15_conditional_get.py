@@ -0,0 +1,198 @@
+from http import HTTPStatus
+
+import pytest
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import CollectionVersion, ImportCheckpoint, Review
+from tests.utils import (create_comments, create_reviews,
+                         create_single_comment)
+from users.models import QueuedEmail, User
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15ConditionalGet:
+
+    TITLES_URL = '/api/v1/titles/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        cache.clear()
+
+    def test_01_reviews_not_modified(self, client, admin_client, admin,
+                                     user_client, user):
+        reviews, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        etag = response['ETag']
+        assert response['Last-Modified']
+
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+        assert not response.content
+        assert response['ETag'] == etag
+        assert len(context.captured_queries) == 1, (
+            'Проверка неизменившейся коллекции должна стоить один запрос.'
+        )
+
+        other_url = self.REVIEWS_URL_TEMPLATE.format(
+            title_id=titles[1]['id']
+        )
+        assert client.get(other_url)['ETag'] != etag
+
+        response = user_client.patch(
+            f'{url}{reviews[1]["id"]}/', data={'text': 'edited'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK
+        assert response['ETag'] != etag
+
+    def test_02_comments_not_modified(self, client, admin_client, admin,
+                                      user_client, user):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], review_id=reviews[0]['id']
+        )
+        etag = client.get(url)['ETag']
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+        create_single_comment(
+            user_client, titles[0]['id'], reviews[0]['id'], 'new'
+        )
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK
+
+    def test_03_titles_not_modified_from_cache(self, client, admin_client,
+                                               settings):
+        settings.API_RESPONSE_CACHE_ENABLED = True
+        response = admin_client.post('/api/v1/categories/', data={
+            'name': 'Фильм', 'slug': 'films'
+        })
+        assert response.status_code == HTTPStatus.CREATED
+        response = client.get(self.TITLES_URL)
+        etag = response['ETag']
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(self.TITLES_URL, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+        assert not context.captured_queries
+
+        response = admin_client.get(self.TITLES_URL, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+        response = admin_client.patch('/api/v1/categories/films/', data={})
+        admin_client.delete('/api/v1/categories/films/')
+        response = client.get(self.TITLES_URL, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK
+
+    def test_04_deleted_parent_is_not_modified_no_more(self, client,
+                                                       admin_client, admin,
+                                                       user_client, user):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        title_id = titles[0]['id']
+        comments_url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=title_id, review_id=reviews[0]['id']
+        )
+        comments_etag = client.get(comments_url)['ETag']
+        empty_url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[1]['id'])
+        empty_etag = client.get(empty_url)['ETag']
+
+        Review.objects.filter(pk=reviews[0]['id']).delete()
+        response = client.get(comments_url, HTTP_IF_NONE_MATCH=comments_etag)
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+        response = admin_client.delete(f'/api/v1/titles/{titles[1]["id"]}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        response = client.get(empty_url, HTTP_IF_NONE_MATCH=empty_etag)
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_05_author_rename_changes_etag(self, client, admin_client, admin,
+                                           user_client, user):
+        reviews, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        etag = client.get(url)['ETag']
+        admin.generate_confirmation_code()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+        response = admin_client.patch(f'/api/v1/users/{user.username}/',
+                                      data={'username': 'renamed'})
+        assert response.status_code == HTTPStatus.OK
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK
+        assert 'renamed' in response.content.decode()
+
+        etag = response['ETag']
+        User.objects.create(username='other', email='other@yamdb.fake')
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == (
+            HTTPStatus.NOT_MODIFIED
+        )
+        User.objects.get(username='other').delete()
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == (
+            HTTPStatus.OK
+        )
+
+    def test_06_versions_follow_visible_changes_only(self, admin_client,
+                                                     admin, user_client,
+                                                     user):
+        keys = set(CollectionVersion.objects.values_list('key', flat=True))
+        assert {CollectionVersion.GLOBAL, CollectionVersion.TITLES} <= keys, (
+            'Строки общих коллекций должны создаваться после миграции.'
+        )
+        for model in (QueuedEmail, ImportCheckpoint, Session):
+            assert not post_save.has_listeners(model)
+            assert not post_delete.has_listeners(model)
+
+        reviews, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[1]["id"]}/'
+
+        def titles_version():
+            return CollectionVersion.objects.get(
+                key=CollectionVersion.TITLES
+            ).version
+
+        version = titles_version()
+        user_client.patch(url, data={'text': 'edited'})
+        # Средняя оценка (5 + 6) // 2 остается 5.
+        user_client.patch(url, data={'score': 6})
+        assert titles_version() == version
+        user_client.patch(url, data={'score': 9})
+        assert titles_version() == version + 1
+
+    def test_07_concurrent_version_creation(self, monkeypatch):
+        key = CollectionVersion.comments_key(1)
+        CollectionVersion.objects.create(key=key, version=1)
+        update = QuerySet.update
+        calls = []
+
+        def missed_update(queryset, **kwargs):
+            # Первое обновление не видит строку, созданную другим запросом.
+            calls.append(kwargs)
+            if len(calls) == 1:
+                return 0
+            return update(queryset, **kwargs)
+
+        monkeypatch.setattr(QuerySet, 'update', missed_update)
+        CollectionVersion.bump(key)
+        assert CollectionVersion.objects.get(key=key).version == 2
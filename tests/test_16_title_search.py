@@ -0,0 +1,88 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+
+from reviews.models import Title
+from reviews.search import search_titles
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16TitleSearch:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        cache.clear()
+
+    def search(self, client, query):
+        response = client.get(self.TITLES_URL, {'search': query})
+        assert response.status_code == HTTPStatus.OK
+        return [title['name'] for title in response.json()['results']]
+
+    def test_01_search_is_case_insensitive_and_ranked(self, client,
+                                                      admin_client):
+        create_titles(admin_client)
+        Title.objects.create(
+            name='Бойцовский клуб', year=1999,
+            description='Первое правило: никому не рассказывать про клуб'
+        )
+        Title.objects.create(
+            name='Клуб «Завтрак»', year=1985, description='Пятеро школьников'
+        )
+        Title.objects.create(
+            name='Вечеринка', year=2000, description='Ночной клуб'
+        )
+        assert self.search(client, 'терминатор') == ['Терминатор']
+        assert self.search(client, 'BACK') == ['Терминатор']
+        assert self.search(client, 'крепк') == ['Крепкий орешек']
+        assert self.search(client, 'орешек кино') == []
+        names = self.search(client, 'клуб')
+        assert set(names) == {
+            'Бойцовский клуб', 'Клуб «Завтрак»', 'Вечеринка'
+        }
+        assert names[-1] == 'Вечеринка', (
+            'Совпадение в названии должно быть выше совпадения в описании.'
+        )
+        assert self.search(client, '"*) OR (') == []
+
+    def test_02_index_follows_changes(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'{self.TITLES_URL}{titles[0]["id"]}/'
+        response = admin_client.patch(url, data={'name': 'Робокоп'})
+        assert response.status_code == HTTPStatus.OK
+        assert self.search(client, 'терминатор') == []
+        assert self.search(client, 'робокоп') == ['Робокоп']
+
+        admin_client.delete(url)
+        assert self.search(client, 'робокоп') == []
+
+    def test_03_search_uses_fts_index(self, admin_client):
+        if connection.vendor != 'sqlite':
+            pytest.skip('Индекс FTS5 используется только на SQLite.')
+        create_titles(admin_client)
+        queryset = Title.objects.all()
+        sql, params = search_titles(
+            queryset, 'терминатор'
+        ).query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            plan = ' '.join(str(row[-1]) for row in cursor.fetchall())
+        assert 'reviews_title_search VIRTUAL TABLE INDEX' in plan
+        assert 'SEARCH reviews_title USING INTEGER PRIMARY KEY' in plan
+
+    def test_04_search_rejects_cursor_pagination(self, client, admin_client):
+        create_titles(admin_client)
+        for params in ({'pagination': 'cursor'}, {'cursor': 'abc'}):
+            response = client.get(self.TITLES_URL,
+                                  {'search': 'терминатор', **params})
+            assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                'Поиск сортирует по релевантности и не совместим '
+                'с курсорной пагинацией.'
+            )
+            assert 'search' in response.json()
+        response = client.get(self.TITLES_URL, {'pagination': 'cursor'})
+        assert response.status_code == HTTPStatus.OK
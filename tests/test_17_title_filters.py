@@ -0,0 +1,80 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Genre, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17TitleFilters:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    @pytest.fixture
+    def titles(self):
+        drama = Genre.objects.create(name='Драма', slug='drama')
+        dramedy = Genre.objects.create(name='Драмеди', slug='drama-comedy')
+        comedy = Genre.objects.create(name='Комедия', slug='comedy')
+        films = Category.objects.create(name='Фильм', slug='films')
+        books = Category.objects.create(name='Книга', slug='books')
+        genres = {
+            'both': (drama, comedy),
+            'drama': (drama, dramedy),
+            'comedy': (comedy,),
+        }
+        for name, title_genres in genres.items():
+            title = Title.objects.create(
+                name=name, year=2000,
+                category=films if name != 'comedy' else books
+            )
+            title.genre.set(title_genres)
+
+    def names(self, client, query):
+        response = client.get(self.TITLES_URL, query)
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        names = [title['name'] for title in data['results']]
+        assert data['count'] == len(names)
+        return sorted(names)
+
+    def test_01_contains_mode_has_no_duplicates(self, client, titles):
+        assert self.names(client, {'genre': 'dram'}) == ['both', 'drama']
+
+    def test_02_exact_mode(self, client, titles):
+        exact = {'match': 'exact'}
+        assert self.names(client, {**exact, 'genre': 'dram'}) == []
+        assert self.names(client, {**exact, 'genre': 'drama'}) == [
+            'both', 'drama'
+        ]
+        assert self.names(client, {**exact, 'genre': 'drama,comedy'}) == [
+            'both', 'comedy', 'drama'
+        ]
+        assert self.names(
+            client, {**exact, 'genre': 'drama,comedy', 'genre_op': 'and'}
+        ) == ['both']
+        assert self.names(
+            client, {**exact, 'genre': 'drama,missing', 'genre_op': 'and'}
+        ) == []
+        assert self.names(client, {**exact, 'category': 'films'}) == [
+            'both', 'drama'
+        ]
+        assert self.names(client, {**exact, 'category': 'film'}) == []
+        response = client.get(self.TITLES_URL, {'match': 'fuzzy'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_03_exact_mode_uses_exists(self, admin_client, titles):
+        with CaptureQueriesContext(connection) as context:
+            admin_client.get(self.TITLES_URL, {
+                'match': 'exact', 'genre': 'drama,comedy', 'genre_op': 'and'
+            })
+        sql = [query['sql'] for query in context.captured_queries]
+        title_queries = [
+            query for query in sql if 'FROM "reviews_title"' in query
+        ]
+        assert title_queries
+        for query in title_queries:
+            assert 'EXISTS' in query
+            assert 'INNER JOIN "reviews_genretitle"' not in query
+            assert 'reviews_genre"."slug' not in query
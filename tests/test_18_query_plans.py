@@ -0,0 +1,101 @@
+import re
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.models import User
+
+FULL_SCAN = re.compile(r'^SCAN (\w+)$')
+SORT = 'USE TEMP B-TREE FOR ORDER BY'
+
+
+def explain(sql):
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return [row[-1] for row in cursor.fetchall()]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18QueryPlans:
+
+    @pytest.fixture
+    def urls(self):
+        if connection.vendor != 'sqlite':
+            pytest.skip('Планы запросов разбираются в формате SQLite.')
+        user = User.objects.create(username='reader', email='r@yamdb.fake')
+        category = Category.objects.create(name='Фильм', slug='films')
+        genre = Genre.objects.create(name='Драма', slug='drama')
+        title = Title.objects.create(name='Фильм', year=2000,
+                                     category=category)
+        title.genre.set((genre,))
+        review = Review.objects.create(author=user, title=title,
+                                       text='Отзыв', score=5)
+        Comment.objects.create(author=user, review=review, text='Комментарий')
+        reviews_url = f'/api/v1/titles/{title.id}/reviews/'
+        return (
+            '/api/v1/titles/',
+            '/api/v1/titles/?pagination=cursor',
+            '/api/v1/titles/?year=2000',
+            '/api/v1/titles/?match=exact&category=films',
+            '/api/v1/titles/?match=exact&genre=drama',
+            reviews_url,
+            f'{reviews_url}?pagination=cursor',
+            f'{reviews_url}{review.id}/comments/',
+            f'{reviews_url}{review.id}/comments/?pagination=cursor',
+            '/api/v1/genres/',
+            '/api/v1/categories/',
+        )
+
+    def test_01_list_queries_use_indexes(self, admin_client, urls):
+        for url in urls:
+            with CaptureQueriesContext(connection) as context:
+                admin_client.get(url)
+            for query in context.captured_queries:
+                sql = query['sql']
+                if not sql.startswith('SELECT'):
+                    continue
+                plan = explain(sql)
+                scans = [step for step in plan if FULL_SCAN.match(step)]
+                assert not scans, (
+                    f'Запрос эндпоинта `{url}` читает таблицу целиком: '
+                    f'{scans}\n{sql}'
+                )
+                if ' LIMIT ' in sql:
+                    assert SORT not in plan, (
+                        f'Страница эндпоинта `{url}` сортируется без '
+                        f'индекса:\n{sql}'
+                    )
+
+    def test_02_next_cursor_page_seeks_index(self, admin_client, urls):
+        title = Title.objects.get()
+        review = Review.objects.get()
+        user = User.objects.get(username='reader')
+        titles = [Title(name=f'Фильм {number}', year=1990 + number)
+                  for number in range(12)]
+        Title.objects.bulk_create(titles)
+        reviews = [Review(author=User.objects.create(
+            username=f'reader{number}', email=f'r{number}@yamdb.fake'
+        ), title=title, text='Отзыв', score=5) for number in range(12)]
+        Review.objects.bulk_create(reviews)
+        Comment.objects.bulk_create(
+            Comment(author=user, review=review, text='Комментарий')
+            for _ in range(12)
+        )
+        for url in urls:
+            if 'pagination=cursor' not in url:
+                continue
+            next_url = admin_client.get(url).json()['next']
+            assert next_url, url
+            with CaptureQueriesContext(connection) as context:
+                admin_client.get(next_url)
+            sql = next(
+                query['sql'] for query in context.captured_queries
+                if ' ORDER BY ' in query['sql'] and ' LIMIT ' in query['sql']
+            )
+            plan = explain(sql)
+            assert plan[0].startswith('SEARCH '), (
+                f'Следующая страница `{url}` читает индекс с начала, '
+                f'а не с позиции курсора: {plan}\n{sql}'
+            )
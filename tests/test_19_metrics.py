@@ -0,0 +1,75 @@
+from http import HTTPStatus
+
+import pytest
+
+from api import metrics
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19Metrics:
+
+    METRICS_URL = '/api/v1/metrics/'
+    TITLES_URL = '/api/v1/titles/'
+
+    @pytest.fixture(autouse=True)
+    def enable_metrics(self, settings):
+        settings.API_METRICS_ENABLED = True
+        settings.API_METRICS_SERVER_TIMING = True
+        settings.API_RESPONSE_CACHE_ENABLED = False
+        metrics.clear()
+
+    def test_01_requests_are_measured(self, client, admin_client):
+        create_titles(admin_client)
+        for _ in range(3):
+            response = client.get(self.TITLES_URL)
+        timing = response['Server-Timing']
+        assert 'db;dur=' in timing
+        assert 'serialize;dur=' in timing
+        assert 'render;dur=' in timing
+        assert 'total;dur=' in timing
+
+        response = admin_client.get(self.METRICS_URL)
+        assert response.status_code == HTTPStatus.OK
+        report = response.json()['routes']
+        titles = report['GET /api/v1/titles/']
+        assert titles['count'] == 3
+        assert set(titles) == {
+            'count', 'wall_ms', 'sql_ms', 'queries', 'serialize_ms',
+            'render_ms'
+        }
+        assert titles['serialize_ms']['p50'] > 0
+        assert titles['queries']['p50'] == titles['queries']['p99'] > 0
+        assert titles['wall_ms']['p99'] >= titles['sql_ms']['p99']
+        assert 'POST /api/v1/titles/' in report
+
+    def test_02_metrics_are_admin_only(self, client, user_client):
+        assert client.get(self.METRICS_URL).status_code == (
+            HTTPStatus.UNAUTHORIZED
+        )
+        assert user_client.get(self.METRICS_URL).status_code == (
+            HTTPStatus.FORBIDDEN
+        )
+
+    def test_03_ring_buffer_percentiles(self):
+        for value in range(1, 101):
+            metrics.record('GET /route', wall_ms=value, sql_ms=0,
+                           queries=1, serialize_ms=0, render_ms=0)
+        report = metrics.get_report()['GET /route']
+        assert report['wall_ms'] == {'p50': 50, 'p95': 95, 'p99': 99}
+
+    def test_04_serialization_is_measured_for_drf_serializers(
+        self, client, admin_client
+    ):
+        titles, _, _ = create_titles(admin_client)
+        client.get('/api/v1/genres/')
+        client.get(f'{self.TITLES_URL}{titles[0]["id"]}/')
+        report = admin_client.get(self.METRICS_URL).json()['routes']
+        for route in ('GET /api/v1/genres/',
+                      'GET /api/v1/titles/(?P<pk>[^/.]+)/'):
+            assert report[route]['serialize_ms']['p50'] > 0, route
+
+
+@pytest.mark.django_db
+def test_disabled_by_default(client):
+    assert 'Server-Timing' not in client.get('/api/v1/titles/')
@@ -0,0 +1,48 @@
+import json
+
+import pytest
+
+from api.benchmark import SCENARIOS, run_benchmark
+from reviews.models import Comment, GenreTitle, Review, Title
+from reviews.synthetic import generate_dataset
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20Benchmark:
+
+    def test_01_dataset_is_reproducible(self):
+        dataset = generate_dataset(titles=20, genres=4, categories=2,
+                                   users=6, reviews_per_title=3,
+                                   comments_per_review=2, seed=7)
+        assert dataset['reviews'] == Review.objects.count() == 60
+        assert dataset['comments'] == Comment.objects.count() == 120
+        assert GenreTitle.objects.count() >= 20
+        names = list(Title.objects.order_by('id').values_list('name', 'year'))
+        ratings = [title.rating for title in Title.objects.all()]
+        assert all(ratings)
+
+        Title.objects.all().delete()
+        generate_dataset(titles=20, genres=0, categories=0, users=0, seed=7)
+        assert list(
+            Title.objects.order_by('id').values_list('name', 'year')
+        ) == names
+
+    def test_02_report(self, settings):
+        settings.API_RESPONSE_CACHE_ENABLED = False
+        dataset = generate_dataset(titles=20, genres=4, categories=2,
+                                   users=6, reviews_per_title=3)
+        report = json.loads(json.dumps(
+            run_benchmark(dataset, tuple(SCENARIOS), requests=3,
+                          encoding_repeats=2)
+        ))
+        encoding = report['encoding']
+        assert encoding['titles'] == 20
+        stdlib, fast = encoding['renderers'].values()
+        assert stdlib['bytes'] == fast['bytes']
+        assert report['meta']['dataset'] == dataset
+        assert set(report['scenarios']) == set(SCENARIOS)
+        for name, result in report['scenarios'].items():
+            assert result['requests'] == 3
+            assert result['errors'] == 0, name
+            assert set(result['latency_ms']) == {'p50', 'p95', 'p99', 'mean'}
+            assert result['queries']['max'] >= 1
@@ -0,0 +1,70 @@
+import datetime
+import io
+import uuid
+from decimal import Decimal
+from http import HTTPStatus
+
+import pytest
+from django.utils import timezone
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+
+from api import renderers
+from api.parsers import FastJSONParser
+from api.renderers import FastJSONRenderer
+
+
+class Test21FastJSON:
+
+    DATA = {
+        'pub_date': timezone.now(),
+        'naive': datetime.datetime(2020, 1, 13, 10, 30, 15, 123456),
+        'day': datetime.date(2020, 1, 13),
+        'rating': Decimal('7.5'),
+        'score': 7.25,
+        'uuid': uuid.uuid4(),
+        'text': 'Строка\u2028с разделителем\u2029',
+        'results': [{'id': 1, 'genre': [], 'rating': None}],
+    }
+
+    def test_01_output_matches_drf(self):
+        assert FastJSONRenderer().render(self.DATA) == (
+            JSONRenderer().render(self.DATA)
+        )
+        assert FastJSONRenderer().render(None) == b''
+
+    def test_02_indent_and_fallback(self, monkeypatch):
+        media_type = 'application/json; indent=4'
+        assert FastJSONRenderer().render(self.DATA, media_type) == (
+            JSONRenderer().render(self.DATA, media_type)
+        )
+        monkeypatch.setattr(renderers, 'orjson', None)
+        assert FastJSONRenderer().render(self.DATA) == (
+            JSONRenderer().render(self.DATA)
+        )
+
+    def test_03_parser(self):
+        parser = FastJSONParser()
+        body = '{"username": "юзер", "score": 5}'.encode()
+        assert parser.parse(io.BytesIO(body)) == {
+            'username': 'юзер', 'score': 5
+        }
+        with pytest.raises(ParseError):
+            parser.parse(io.BytesIO(b'{"username": NaN}'))
+        with pytest.raises(ParseError):
+            parser.parse(io.BytesIO(b'{"username": '))
+
+    @pytest.mark.django_db
+    def test_04_api_uses_fast_json(self, admin_client):
+        response = admin_client.post(
+            '/api/v1/genres/', data='{"name": "Драма", "slug": "drama"}',
+            content_type='application/json'
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        assert response['Content-Type'] == 'application/json'
+        assert response.content == '{"name":"Драма","slug":"drama"}'.encode()
+        response = admin_client.post(
+            '/api/v1/genres/', data='{"name": ',
+            content_type='application/json'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
@@ -0,0 +1,66 @@
+import json
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory
+
+from api.serializers import (CommentSerializer, ReviewSerializer,
+                             TitleGetSerializer)
+from reviews.models import Comment, Review, Title
+from reviews.synthetic import generate_dataset
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22FlatSerializers:
+
+    @pytest.fixture(autouse=True)
+    def dataset(self, settings):
+        settings.API_RESPONSE_CACHE_ENABLED = False
+        generate_dataset(titles=15, genres=5, categories=3, users=6,
+                         reviews_per_title=4, comments_per_review=3)
+        Title.objects.filter(pk=1).update(category=None)
+        Title.objects.get(pk=2).genre.clear()
+        Review.objects.filter(title_id=3).delete()
+
+    def assert_same_as_serializer(self, client, url, serializer_class,
+                                  queryset):
+        for query in ('', '?pagination=cursor'):
+            response = client.get(f'{url}{query}')
+            results = response.json()['results']
+            ids = [item['id'] for item in results]
+            objects = {obj.id: obj for obj in queryset.filter(id__in=ids)}
+            expected = serializer_class(
+                [objects[pk] for pk in ids], many=True,
+                context={'request': APIRequestFactory().get(url)}
+            ).data
+            assert results == json.loads(json.dumps(expected))
+
+    def test_01_titles(self, client):
+        self.assert_same_as_serializer(
+            client, '/api/v1/titles/', TitleGetSerializer, Title.objects
+        )
+        response = client.get('/api/v1/titles/?page=2')
+        assert len(response.json()['results']) == 5
+
+    def test_02_reviews_and_comments(self, client):
+        for title_id in (1, 3):
+            self.assert_same_as_serializer(
+                client, f'/api/v1/titles/{title_id}/reviews/',
+                ReviewSerializer, Review.objects
+            )
+        review = Review.objects.filter(title_id=2).first()
+        self.assert_same_as_serializer(
+            client, f'/api/v1/titles/2/reviews/{review.id}/comments/',
+            CommentSerializer, Comment.objects
+        )
+
+    def test_03_no_per_row_queries(self, client):
+        urls = ('/api/v1/titles/', '/api/v1/titles/1/reviews/',
+                '/api/v1/titles/1/reviews/1/comments/')
+        for url in urls:
+            with CaptureQueriesContext(connection) as context:
+                client.get(url)
+            # Версия коллекции, родительский объект или COUNT, страница,
+            # жанры страницы произведений.
+            assert len(context.captured_queries) <= 4, url
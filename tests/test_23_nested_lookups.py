@@ -0,0 +1,72 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Comment, Review
+from reviews.synthetic import generate_dataset
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    return response, len(context.captured_queries)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23NestedLookups:
+
+    @pytest.fixture(autouse=True)
+    def dataset(self):
+        generate_dataset(titles=3, genres=2, categories=1, users=4,
+                         reviews_per_title=2, comments_per_review=2)
+
+    def test_01_nested_lists_do_not_fetch_parent(self, client):
+        # Версия коллекции, COUNT и страница.
+        response, queries = count_queries(client, '/api/v1/titles/1/reviews/')
+        assert response.status_code == HTTPStatus.OK
+        assert queries == 3
+        response, queries = count_queries(
+            client, '/api/v1/titles/1/reviews/1/comments/'
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert queries == 3
+
+    def test_02_missing_parent_is_not_found(self, client):
+        Review.objects.filter(title_id=2).delete()
+        response = client.get('/api/v1/titles/2/reviews/')
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['results'] == []
+        for url in ('/api/v1/titles/999/reviews/',
+                    '/api/v1/titles/999/reviews/?pagination=cursor',
+                    '/api/v1/titles/1/reviews/999/comments/'):
+            assert client.get(url).status_code == HTTPStatus.NOT_FOUND, url
+
+    def test_03_comments_are_checked_against_title(self, client,
+                                                   user_client):
+        review = Review.objects.filter(title_id=1).first()
+        comment = Comment.objects.filter(review=review).first()
+        wrong = f'/api/v1/titles/2/reviews/{review.id}/comments/'
+        assert client.get(wrong).status_code == HTTPStatus.NOT_FOUND
+        assert client.get(
+            f'{wrong}{comment.id}/'
+        ).status_code == HTTPStatus.NOT_FOUND
+        response = user_client.post(wrong, data={'text': 'Комментарий'})
+        assert response.status_code == HTTPStatus.NOT_FOUND
+        Comment.objects.filter(review=review).delete()
+        assert client.get(wrong).status_code == HTTPStatus.NOT_FOUND
+
+    def test_04_create_fetches_parent_once(self, user_client):
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(
+                '/api/v1/titles/1/reviews/1/comments/',
+                data={'text': 'Комментарий'}
+            )
+        assert response.status_code == HTTPStatus.CREATED
+        review_lookups = [
+            query for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+            and 'FROM "reviews_review"' in query['sql']
+        ]
+        assert len(review_lookups) == 1
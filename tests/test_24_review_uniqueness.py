@@ -0,0 +1,48 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Review, Title
+from reviews.synthetic import generate_dataset
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24ReviewUniqueness:
+
+    URL = '/api/v1/titles/1/reviews/'
+
+    @pytest.fixture(autouse=True)
+    def dataset(self):
+        generate_dataset(titles=1, genres=1, categories=1, users=1,
+                         reviews_per_title=0, comments_per_review=0)
+
+    def test_01_no_select_before_insert(self, user_client):
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(self.URL, data={
+                'text': 'Отзыв', 'score': 8
+            })
+        assert response.status_code == HTTPStatus.CREATED
+        review_selects = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+            and 'FROM "reviews_review"' in query['sql']
+        ]
+        assert not review_selects
+
+    def test_02_duplicate_is_rejected_by_constraint(self, user_client):
+        data = {'text': 'Отзыв', 'score': 8}
+        assert user_client.post(self.URL, data=data).status_code == (
+            HTTPStatus.CREATED
+        )
+        response = user_client.post(self.URL, data={
+            'text': 'Еще отзыв', 'score': 2
+        })
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert response.json() == {
+            'non_field_errors': ['Вы уже оставляли отзыв на это произведение']
+        }
+        assert Review.objects.count() == 1
+        title = Title.objects.get(pk=1)
+        assert (title.rating_sum, title.rating_count) == (8, 1)
@@ -0,0 +1,55 @@
+import sqlite3
+
+import pytest
+from django.db import connection, connections, transaction
+
+from api_yamdb.sqlite_tuned.base import DatabaseWrapper
+
+
+@pytest.fixture
+def tuned_db(tmp_path):
+    settings_dict = dict(connection.settings_dict)
+    settings_dict.update({
+        'ENGINE': 'api_yamdb.sqlite_tuned',
+        'NAME': str(tmp_path / 'tuned.sqlite3'),
+        'OPTIONS': {'timeout': 0},
+    })
+    wrapper = DatabaseWrapper(settings_dict, alias='tuned')
+    connections['tuned'] = wrapper
+    yield wrapper
+    wrapper.close()
+    del connections['tuned']
+
+
+def pragma(db, name):
+    with db.cursor() as cursor:
+        cursor.execute(f'PRAGMA {name}')
+        return cursor.fetchone()[0]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25SQLiteTuned:
+
+    def test_01_pragmas(self, tuned_db):
+        assert pragma(tuned_db, 'journal_mode') == 'wal'
+        assert pragma(tuned_db, 'synchronous') == 1
+        assert pragma(tuned_db, 'busy_timeout') == 20000
+        assert pragma(tuned_db, 'cache_size') == -64 * 1024
+
+    def test_02_custom_pragmas(self, tuned_db):
+        tuned_db.settings_dict['PRAGMAS'] = {'journal_mode': 'DELETE'}
+        assert pragma(tuned_db, 'journal_mode') == 'delete'
+
+    def test_03_transaction_takes_write_lock(self, tuned_db):
+        with tuned_db.cursor() as cursor:
+            cursor.execute('CREATE TABLE item (id integer)')
+        other = sqlite3.connect(tuned_db.settings_dict['NAME'], timeout=0)
+        try:
+            with transaction.atomic(using='tuned'):
+                # Блокировка на запись взята до первой записи в транзакции.
+                with pytest.raises(sqlite3.OperationalError, match='locked'):
+                    other.execute('BEGIN IMMEDIATE')
+            other.execute('BEGIN IMMEDIATE')
+            other.rollback()
+        finally:
+            other.close()
@@ -0,0 +1,133 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection, connections
+
+from api import replicas
+from reviews.models import Genre, Title
+from users.models import User
+
+
+@pytest.fixture
+def add_replica(tmp_path, settings):
+    """
+    Подключает реплику: SQLite-файл с копией основной БД на момент
+    вызова. Реплика с missing=True недоступна.
+    """
+    settings.DATABASE_REPLICAS = []
+    settings.API_RESPONSE_CACHE_ENABLED = False
+    added = []
+
+    def add(alias, missing=False):
+        path = tmp_path / alias / 'db.sqlite3'
+        if not missing:
+            path.parent.mkdir()
+            with connection.cursor() as cursor:
+                cursor.execute('VACUUM INTO %s', (str(path),))
+        settings_dict = dict(connection.settings_dict, NAME=str(path))
+        connections[alias] = type(connections['default'])(
+            settings_dict, alias
+        )
+        added.append(alias)
+        settings.DATABASE_REPLICAS = settings.DATABASE_REPLICAS + [alias]
+
+    yield add
+    for alias in added:
+        connections[alias].close()
+        del connections[alias]
+
+
+def genre_names(response):
+    assert response.status_code == HTTPStatus.OK
+    return [genre['name'] for genre in response.json()['results']]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27Replicas:
+
+    def test_01_safe_requests_read_from_replica(self, client, admin_client,
+                                                add_replica):
+        Genre.objects.create(name='Драма', slug='drama')
+        add_replica('replica')
+        Genre.objects.create(name='Комедия', slug='comedy')
+        title = Title.objects.create(name='Новое', year=2000)
+
+        assert genre_names(client.get('/api/v1/genres/')) == ['Драма']
+        assert client.get(
+            f'/api/v1/titles/{title.id}/'
+        ).status_code == HTTPStatus.NOT_FOUND
+        # Администратора еще нет на реплике: пользователь запроса
+        # читается с основной БД.
+        assert genre_names(admin_client.get('/api/v1/genres/')) == ['Драма']
+
+        response = admin_client.post(
+            '/api/v1/genres/', data={'name': 'Ужасы', 'slug': 'horror'}
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        assert Genre.objects.filter(slug='horror').exists()
+        assert not Genre.objects.using('replica').filter(
+            slug='horror'
+        ).exists()
+
+        response = client.post('/api/v1/auth/signup/', data={
+            'username': 'newbie', 'email': 'newbie@yamdb.fake'
+        })
+        assert response.status_code == HTTPStatus.OK
+        assert User.objects.filter(username='newbie').exists()
+        response = admin_client.get('/api/v1/users/?search=newbie')
+        assert response.json()['count'] == 1
+
+    def test_02_request_is_pinned_after_write(self, add_replica):
+        Genre.objects.create(name='Драма', slug='drama')
+        add_replica('replica')
+        Genre.objects.create(name='Комедия', slug='comedy')
+        with replicas.read_from_replica():
+            assert Genre.objects.count() == 1
+            Genre.objects.create(name='Ужасы', slug='horror')
+            assert Genre.objects.count() == 3
+        with replicas.read_from_replica():
+            assert Genre.objects.count() == 1
+            with replicas.read_from_primary():
+                assert Genre.objects.count() == 3
+        assert Genre.objects.count() == 3
+
+    def test_03_round_robin_skips_broken_replicas(self, add_replica,
+                                                  monkeypatch):
+        add_replica('replica1')
+        add_replica('broken', missing=True)
+        add_replica('replica2')
+        assert {replicas.get_replica() for _ in range(6)} == {
+            'replica1', 'replica2'
+        }
+
+        checks = []
+        check_replica = replicas.check_replica
+        monkeypatch.setattr(replicas, 'check_replica', lambda alias: (
+            checks.append(alias) or check_replica(alias)
+        ))
+        for _ in range(6):
+            replicas.get_replica()
+        assert checks == []
+
+    def test_04_without_healthy_replicas_reads_primary(self, add_replica):
+        add_replica('broken', missing=True)
+        Genre.objects.create(name='Драма', slug='drama')
+        assert replicas.get_replica() is None
+        with replicas.read_from_replica():
+            assert Genre.objects.count() == 1
+
+    def test_05_response_cache_is_filled_from_primary(self, client,
+                                                      add_replica, settings):
+        add_replica('replica')
+        settings.API_RESPONSE_CACHE_ENABLED = True
+        Genre.objects.create(name='Драма', slug='drama')
+
+        response = client.get('/api/v1/genres/')
+        assert response['X-Cache'] == 'MISS'
+        assert genre_names(response) == ['Драма']
+        response = client.get('/api/v1/genres/')
+        assert response['X-Cache'] == 'HIT'
+        assert genre_names(response) == ['Драма']
+        # Без кеша реплика отстает.
+        settings.API_RESPONSE_CACHE_ENABLED = False
+        assert genre_names(client.get('/api/v1/genres/')) == []
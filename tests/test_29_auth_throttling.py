@@ -0,0 +1,93 @@
+from http import HTTPStatus
+from types import SimpleNamespace
+
+import pytest
+from django.core import mail
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api import throttling
+
+SIGNUP_URL = '/api/v1/auth/signup/'
+TOKEN_URL = '/api/v1/auth/token/'
+
+
+def signup(client, number):
+    return client.post(SIGNUP_URL, data={
+        'username': f'user{number}', 'email': f'user{number}@yamdb.fake'
+    })
+
+
+@pytest.mark.django_db(transaction=True)
+class Test29AuthThrottling:
+
+    @pytest.fixture(autouse=True)
+    def enable_throttling(self, settings, monkeypatch):
+        settings.API_AUTH_THROTTLE_ENABLED = True
+        settings.API_AUTH_THROTTLE_RATES = {
+            'auth_signup': {'ip': '4/m', 'username': '2/m', 'email': '2/m'},
+            'auth_token': {'username': '2/m'},
+        }
+        cache.clear()
+        self.clock = [600.0]
+        monkeypatch.setattr(throttling, 'time', SimpleNamespace(
+            time=lambda: self.clock[0]
+        ))
+
+    def test_01_rejected_before_db_and_mail(self, client):
+        for _ in range(2):
+            assert signup(client, 1).status_code == HTTPStatus.OK
+        sent = len(mail.outbox)
+        with CaptureQueriesContext(connection) as queries:
+            response = signup(client, 1)
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+        assert int(response['Retry-After']) == 60
+        assert len(queries) == 0
+        assert len(mail.outbox) == sent
+
+        # Тот же username с другим email тоже ограничен.
+        response = client.post(SIGNUP_URL, data={
+            'username': 'USER1', 'email': 'other@yamdb.fake'
+        })
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+
+    def test_02_ip_limit(self, client):
+        for number in range(4):
+            assert signup(client, number).status_code == HTTPStatus.OK
+        response = signup(client, 5)
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+        response = client.post(SIGNUP_URL, data={'username': 'user6'},
+                               REMOTE_ADDR='10.0.0.2')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_03_sliding_window(self, client):
+        data = {'username': 'nobody', 'confirmation_code': 'wrong'}
+        for _ in range(2):
+            response = client.post(TOKEN_URL, data=data)
+            assert response.status_code == HTTPStatus.NOT_FOUND
+        assert client.post(TOKEN_URL, data=data).status_code == (
+            HTTPStatus.TOO_MANY_REQUESTS
+        )
+        # Через 75 секунд прошлое окно учитывается с весом 0.75.
+        self.clock[0] += 75
+        assert client.post(TOKEN_URL, data=data).status_code == (
+            HTTPStatus.NOT_FOUND
+        )
+        response = client.post(TOKEN_URL, data=data)
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+        assert int(response['Retry-After']) == 15
+
+    def test_04_rejections_in_metrics(self, client, admin_client):
+        for _ in range(3):
+            signup(client, 1)
+        response = admin_client.get('/api/v1/metrics/')
+        assert response.json()['throttling'] == {
+            'auth_signup': {'ip': 0, 'username': 1, 'email': 0},
+            'auth_token': {'username': 0},
+        }
+
+    def test_05_disabled(self, client, settings):
+        settings.API_AUTH_THROTTLE_ENABLED = False
+        for _ in range(5):
+            assert signup(client, 1).status_code == HTTPStatus.OK